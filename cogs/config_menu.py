@@ -133,28 +133,28 @@ class ConfigSelect(Select):
                 prompt="Enter the **minimum number of upvotes** a Reddit post must have to be mirrored.",
                 min_value=1,
                 max_value=1000,
-                default=get_config("reddit_min_upvotes") or 20
+                default=get_config(interaction.guild_id, "reddit_min_upvotes") or 20
             )
 
         elif choice == "toggle_counting":
-            current = get_config("counting_paused") or False
+            current = get_config(interaction.guild_id, "counting_paused") or False
             new = not current
-            set_config("counting_paused", new)
+            await set_config(interaction.guild_id, "counting_paused", new)
             state = "✅ Enabled" if not new else "❌ Disabled"
             await interaction.response.send_message(f"🔢 Counting game is now {state}.", ephemeral=True)
 
 
         elif choice == "toggle_welcome":
-            current = get_config("welcome_enabled") or False
+            current = get_config(interaction.guild_id, "welcome_enabled") or False
             new = not current
-            set_config("welcome_enabled", new)
+            await set_config(interaction.guild_id, "welcome_enabled", new)
             state = "enabled" if new else "disabled"
             await interaction.response.send_message(f"👋 Welcome messages are now **{state}**.", ephemeral=True)
 
         elif choice == "toggle_reddit":
-            current = get_config("reddit_enabled") or False
+            current = get_config(interaction.guild_id, "reddit_enabled") or False
             new = not current
-            set_config("reddit_enabled", new)
+            await set_config(interaction.guild_id, "reddit_enabled", new)
             state = "enabled" if new else "disabled"
             await interaction.response.send_message(f"📡 Reddit mirror is now **{state}**.", ephemeral=True)
 
@@ -185,7 +185,7 @@ class ChannelSelectView(View):
         channel_id = int(selected)
         channel = interaction.guild.get_channel(channel_id)
 
-        set_config(self.config_key, channel_id)
+        await set_config(interaction.guild_id, self.config_key, channel_id)
         mention = channel.mention if hasattr(channel, "mention") else f"<#{channel_id}>"
         label = self.config_key.replace("_id", "").replace("_", " ").title()
 
@@ -216,7 +216,7 @@ async def open_number_input(interaction, config_key, prompt, min_value=1, max_va
                 value = int(self.upvotes.value)
                 if value < min_value or value > max_value:
                     raise ValueError
-                set_config(config_key, value)
+                await set_config(modal_interaction.guild_id, config_key, value)
                 await modal_interaction.response.send_message(
                     f"✅ Minimum upvotes set to **{value}**.", ephemeral=True
                 )
@@ -1,18 +1,145 @@
 # cogs/counting_game.py
 
+import asyncio
+
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 
 from database.config_store import get_config, set_config
-from database.stats_store import get_user_stat, increment_user_stat, set_global_stat
+from database.stats_store import get_user_stat, increment_user_stat, flush_user_stats, get_leaderboard, set_global_stat
+
+FLUSH_SECONDS = 5  # how often queued counts and scores are written to SQLite
+LEADERBOARD_PAGE_SIZE = 10
+
+
+def score_stat(guild_id: int) -> str:
+    """Counting scores are kept per guild, like the count itself."""
+    return f"counting_score:{guild_id}"
+
+
+class CountingState:
+    """Authoritative count for one channel. SQLite only holds a delayed copy."""
+
+    def __init__(self, count: int = 0, last_user_id: int = None):
+        self.count = count
+        self.last_user_id = last_user_id
+        self.lock = asyncio.Lock()
+        self.dirty = False
+
+    def apply(self, user_id: int, number: int) -> bool:
+        """Check a counted number in O(1). A wrong number or a double count resets to 0."""
+        if number != self.count + 1 or user_id == self.last_user_id:
+            self.reset(0)
+            return False
+        self.count = number
+        self.last_user_id = user_id
+        self.dirty = True
+        return True
+
+    def reset(self, count: int):
+        self.count = count
+        self.last_user_id = None
+        self.dirty = True
+
+
+class LeaderboardView(discord.ui.View):
+    def __init__(self, stat: str):
+        super().__init__(timeout=120)
+        self.stat = stat
+        self.page = 0
+
+    def page_count(self) -> int:
+        return max(1, -(-len(get_leaderboard(self.stat)) // LEADERBOARD_PAGE_SIZE))
+
+    def build_embed(self, viewer: discord.abc.User) -> discord.Embed:
+        """The current page; the footer shows the rank of whoever opened or paged it."""
+        board = get_leaderboard(self.stat)
+        self.page = min(self.page, self.page_count() - 1)
+        offset = self.page * LEADERBOARD_PAGE_SIZE
+
+        lines = []
+        for user_id, value in board.page(offset, LEADERBOARD_PAGE_SIZE):
+            lines.append(f"**#{board.rank(user_id)}** <@{user_id}> — `{value}`")
+
+        embed = discord.Embed(
+            title="🏆 Counting Leaderboard",
+            description="\n".join(lines) or "*Nobody has counted yet.*",
+            color=discord.Color.gold()
+        )
+        rank = board.rank(viewer.id)
+        your_rank = f"Your rank: #{rank} of {len(board)}" if rank else "You're not ranked yet"
+        embed.set_footer(text=f"{your_rank} • Page {self.page + 1} of {self.page_count()}")
+        return embed
+
+    @discord.ui.button(label="◀️ Prev", style=discord.ButtonStyle.secondary)
+    async def prev_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = (self.page - 1) % self.page_count()
+        await interaction.response.edit_message(embed=self.build_embed(interaction.user), view=self)
+
+    @discord.ui.button(label="Next ▶️", style=discord.ButtonStyle.secondary)
+    async def next_button(self, interaction: discord.Interaction, button: discord.ui.Button):
+        self.page = (self.page + 1) % self.page_count()
+        await interaction.response.edit_message(embed=self.build_embed(interaction.user), view=self)
+
 
 class CountingGame(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.states = {}  # {guild_id: CountingState}
 
         # Updated emoji cycle
         self.EMOJI_CYCLE = ["✅", "☑️", "🔥", "❤️‍🔥", "🌟"]
+        self.flush_state.start()
+
+    async def cog_unload(self):
+        self.flush_state.cancel()
+        await self.persist_counts()
+        await flush_user_stats()
+
+    def get_state(self, guild_id: int) -> CountingState:
+        state = self.states.get(guild_id)
+        if state is None:
+            # Recover the last durable state (served from the config cache).
+            state = CountingState(
+                get_config(guild_id, "current_count") or 0,
+                get_config(guild_id, "last_counter_id")
+            )
+            self.states[guild_id] = state
+        return state
+
+    async def set_state_value(self, guild_id: int, key: str, value):
+        """Apply a manual current_count / last_counter_id edit to the live state, then persist it."""
+        state = self.get_state(guild_id)
+        async with state.lock:
+            if key == "current_count":
+                state.count = value or 0
+            else:
+                state.last_user_id = value
+            state.dirty = True
+        await self.persist_counts()
+
+    async def persist_counts(self):
+        for guild_id, state in list(self.states.items()):
+            if not state.dirty:
+                continue
+            async with state.lock:
+                count, last_user_id = state.count, state.last_user_id
+                state.dirty = False
+            try:
+                await set_config(guild_id, "current_count", count)
+                await set_config(guild_id, "last_counter_id", last_user_id)
+            except Exception:
+                state.dirty = True
+                raise
+
+    @tasks.loop(seconds=FLUSH_SECONDS)
+    async def flush_state(self):
+        try:
+            await self.persist_counts()
+            await flush_user_stats()
+        except Exception as e:
+            print(f"[CountingGame] Failed to flush counting state: {e}")
 
     def get_cycle_emoji(self, count: int) -> str:
         index = (count // 100) % len(self.EMOJI_CYCLE)
@@ -20,17 +147,18 @@ class CountingGame(commands.Cog):
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
-        if message.author.bot:
+        if message.author.bot or message.guild is None:
             return
 
-        counting_channel_id = get_config("counting_channel_id")
+        guild_id = message.guild.id
+        counting_channel_id = get_config(guild_id, "counting_channel_id")
         if not counting_channel_id or message.channel.id != int(counting_channel_id):
             return
 
-        if get_config("counting_paused"):
+        if get_config(guild_id, "counting_paused"):
             return
 
-        allow_chat = get_config("allow_chat_between_counts") or False
+        allow_chat = get_config(guild_id, "allow_chat_between_counts") or False
         content = message.content.strip()
 
         if not content.isdigit() and not allow_chat:
@@ -39,32 +167,27 @@ class CountingGame(commands.Cog):
 
         if content.isdigit():
             user_id = message.author.id
-            current_count = get_config("current_count") or 0
-            expected_count = current_count + 1
-            last_user_id = get_config("last_counter_id")
-
             try:
                 user_count = int(content)
             except ValueError:
                 return
 
-            if user_count != expected_count or user_id == last_user_id:
+            state = self.get_state(guild_id)
+            async with state.lock:
+                counted = state.apply(user_id, user_count)
+
+            # Reactions and announcements go out without holding the lock.
+            if not counted:
                 await message.add_reaction("💥")
                 await message.channel.send(
                     f"❌ {message.author.mention} broke the count at `{user_count}`. Start again from 1!",
                     delete_after=6
                 )
-                set_config("current_count", 0)
-                set_config("last_counter_id", None)
                 return
 
             # ✅ Correct count
-            reaction_emoji = self.get_cycle_emoji(expected_count)
-            await message.add_reaction(reaction_emoji)
-
-            set_config("current_count", user_count)
-            set_config("last_counter_id", user_id)
-            increment_user_stat(user_id, "counting_score")
+            increment_user_stat(user_id, score_stat(guild_id))
+            await message.add_reaction(self.get_cycle_emoji(user_count))
 
             # 🎉 Celebration message on each 100th count
             if user_count % 100 == 0:
@@ -76,19 +199,29 @@ class CountingGame(commands.Cog):
     @app_commands.command(name="pause_counting", description="(ADMIN ONLY) Pause the counting game.")
     @app_commands.checks.has_permissions(administrator=True)
     async def pause_counting(self, interaction: discord.Interaction):
-        set_config("counting_paused", True)
+        await set_config(interaction.guild_id, "counting_paused", True)
         await interaction.response.send_message("⏸️ Counting has been paused.", ephemeral=True)
 
     @app_commands.command(name="resume_counting", description="(ADMIN ONLY) Resume the counting game.")
     @app_commands.checks.has_permissions(administrator=True)
     async def resume_counting(self, interaction: discord.Interaction):
-        set_config("counting_paused", False)
+        await set_config(interaction.guild_id, "counting_paused", False)
         await interaction.response.send_message("▶️ Counting has been resumed.", ephemeral=True)
 
     @app_commands.command(name="counting_stats", description="Show your total counting score.")
     async def counting_stats(self, interaction: discord.Interaction):
-        score = get_user_stat(interaction.user.id, "counting_score")
-        await interaction.response.send_message(f"🧮 {interaction.user.mention}, your counting score is `{score}`!")
+        stat = score_stat(interaction.guild_id)
+        score = await get_user_stat(interaction.user.id, stat)
+        rank = get_leaderboard(stat).rank(interaction.user.id)
+        rank_text = f" (rank **#{rank}**)" if rank else ""
+        await interaction.response.send_message(f"🧮 {interaction.user.mention}, your counting score is `{score}`{rank_text}!")
+
+    @app_commands.command(name="leaderboard", description="Show the counting leaderboard.")
+    @app_commands.describe(page="Page to open (10 users per page)")
+    async def leaderboard(self, interaction: discord.Interaction, page: int = 1):
+        view = LeaderboardView(score_stat(interaction.guild_id))
+        view.page = max(page, 1) - 1
+        await interaction.response.send_message(embed=view.build_embed(interaction.user), view=view)
 
     @app_commands.command(
     name="set_count",
@@ -104,8 +237,10 @@ class CountingGame(commands.Cog):
                 await interaction.followup.send("❌ Count must be 0 or higher.", ephemeral=True)
             return
 
-        set_config("current_count", value)
-        set_config("last_counter_id", None)
+        state = self.get_state(interaction.guild_id)
+        async with state.lock:
+            state.reset(value)
+        await self.persist_counts()
 
         msg = f"✅ The count has been set to `{value}`. Continue counting from here!"
         if not interaction.response.is_done():
@@ -7,6 +7,8 @@ import os
 from dotenv import load_dotenv
 import traceback
 
+from database.config_store import get_cache_stats
+
 load_dotenv()
 DEVELOPER_ID = int(os.getenv("DEVELOPER_ID"))
 GUILD_ID = int(os.getenv("GUILD_ID"))
@@ -76,6 +78,40 @@ class DevTools(commands.Cog):
         except Exception as e:
             await interaction.response.send_message(f"❌ Failed to clear global commands: {e}", ephemeral=True)
 
+    @app_commands.command(name="cache_stats", description="(DEV ONLY) 📊 Show config cache hit rate.")
+    async def cache_stats(self, interaction: discord.Interaction):
+        if not self.is_developer(interaction):
+            return await interaction.response.send_message("❌ Unauthorized", ephemeral=True)
+
+        stats = get_cache_stats()
+        await interaction.response.send_message(
+            f"📊 Config cache: `{stats['hits']}` hits, `{stats['misses']}` misses "
+            f"(`{stats['hit_rate']:.1%}` hit rate)\n"
+            f"💾 DB reads: `{stats['db_reads']}`, writes: `{stats['db_writes']}`, "
+            f"round-trips saved: `{stats['round_trips_saved']}`\n"
+            f"🗂️ Cached keys: `{stats['cached_keys']}` across `{stats['cached_guilds']}` guild(s)",
+            ephemeral=True
+        )
+
+    @app_commands.command(name="welcome_stats", description="(DEV ONLY) 👋 Show how many welcome messages batching saved.")
+    async def welcome_stats(self, interaction: discord.Interaction):
+        if not self.is_developer(interaction):
+            return await interaction.response.send_message("❌ Unauthorized", ephemeral=True)
+
+        welcome = self.bot.get_cog("Welcome")
+        if welcome is None:
+            return await interaction.response.send_message("❌ The welcome cog isn't loaded.", ephemeral=True)
+
+        stats = welcome.get_stats()
+        cards = welcome.renderer.stats
+        await interaction.response.send_message(
+            f"👋 Welcomed `{stats['joins']}` join(s) in `{stats['messages']}` message(s), "
+            f"`{stats['messages_saved']}` message(s) saved\n"
+            f"🖼️ Cards: `{cards['rendered']}` rendered, `{cards['avatar_hits']}` avatar cache hits"
+            f", `{cards['saturated']}` saturated, `{cards['failed']}` failed",
+            ephemeral=True
+        )
+
     @app_commands.command(name="devtest", description="(DEV ONLY) Test if devtools slash commands are registering.")
     async def devtest(self, interaction: discord.Interaction):
         await interaction.response.send_message("✅ Devtools is registering correctly!", ephemeral=True)
@@ -1,92 +1,105 @@
 # cogs/dune_news.py
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
-from bs4 import BeautifulSoup
-import aiohttp
+from bs4 import BeautifulSoup, SoupStrainer
+import asyncio
 import sqlite3
+from html.parser import HTMLParser
 from datetime import datetime
-from database.config_store import get_config
+from database.config_store import get_config, get_guilds_with
+from database.dedupe_store import import_seen_items
+from database.engine import fetchall, transaction
+from feeds.engine import FeedItem, FeedSource, get_feed_engine
+from feeds.http import fetch_parsed, REQUEST_TIMEOUT_SECONDS
 
 DB_PATH = "dune_news.sqlite3"
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/113.0 Safari/537.36"
-    )
-}
+SOURCE_NAME = "dune_news"
 NEWS_INDEX = "https://duneawakening.com/news"
+NEWS_PREFIX = "https://duneawakening.com/news/"
+POLL_SECONDS = 600
+ARTICLE_CONCURRENCY = 5     # article pages fetched at once
 
 
 def init_db():
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
     c.execute("""
-        CREATE TABLE IF NOT EXISTS posted_articles (
+        CREATE TABLE IF NOT EXISTS articles (
             url TEXT PRIMARY KEY,
-            posted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            title TEXT,
+            content TEXT,
+            image TEXT,
+            published TEXT,
+            display_text TEXT,
+            summary TEXT,
+            position INTEGER,
+            fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
+    c.execute("CREATE INDEX IF NOT EXISTS idx_articles_position ON articles (position)")
+    migrate_posted_articles(conn)
+    # The HTTP cache now lives with the shared feed engine.
+    c.execute("DROP TABLE IF EXISTS http_cache")
     conn.commit()
     conn.close()
 
 
-def has_been_posted(url):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute("SELECT 1 FROM posted_articles WHERE url = ?", (url,))
-    result = c.fetchone()
-    conn.close()
-    return result is not None
-
-
-def mark_as_posted(url):
-    conn = sqlite3.connect(DB_PATH)
+def migrate_posted_articles(conn):
+    """Move posted_articles into the shared seen_items dedupe table."""
     c = conn.cursor()
-    c.execute("INSERT OR IGNORE INTO posted_articles (url) VALUES (?)", (url,))
-    conn.commit()
-    conn.close()
-
-
-async def fetch_html(session, url):
-    try:
-        async with session.get(url, headers=HEADERS, timeout=aiohttp.ClientTimeout(total=10)) as res:
-            if res.status != 200:
-                return None, f"HTTP {res.status} error"
-            return await res.text(), None
-    except Exception as e:
-        return None, str(e)
-
-
-async def fetch_news_urls(session, limit=5):
-    html, error = await fetch_html(session, NEWS_INDEX)
-    if error or html is None:
-        return [], error or "Failed to fetch news index."
-
-    soup = BeautifulSoup(html, "html.parser")
+    exists = c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'posted_articles'").fetchone()
+    if not exists:
+        return
+    rows = c.execute("""
+        SELECT url, CAST(strftime('%s', COALESCE(posted_at, CURRENT_TIMESTAMP)) AS INTEGER)
+        FROM posted_articles
+    """).fetchall()
+    import_seen_items(SOURCE_NAME, rows)
+    c.execute("DROP TABLE posted_articles")
+    if rows:
+        print(f"[DuneNews] Moved {len(rows)} posted article(s) to the shared dedupe index.")
+
+
+# Parsers run in the worker processes: module-level functions in, plain data out.
+# The strainers make BeautifulSoup build only the tags we read.
+INDEX_STRAINER = SoupStrainer("a", href=True)
+
+
+def _is_article_tag(name, attrs):
+    if name in ("h1", "time", "main"):
+        return True
+    if name == "meta":
+        return attrs.get("property") == "og:image"
+    if name == "div":
+        classes = attrs.get("class") or ""
+        if not isinstance(classes, str):
+            classes = " ".join(classes)
+        return "content" in classes.split() or classes == "brxe-text-basic news-archive__text"
+    return False
+
+
+ARTICLE_STRAINER = SoupStrainer(_is_article_tag)
+
+
+def parse_news_urls(html):
+    soup = BeautifulSoup(html, "html.parser", parse_only=INDEX_STRAINER)
     links = soup.find_all("a")
 
     seen = set()
     urls = []
     for a in links:
         href = a.get("href", "")
-        if href.startswith("https://duneawakening.com/news/") and href not in seen:
+        if href.startswith(NEWS_PREFIX) and href not in seen:
             seen.add(href)
             urls.append(href)
-        if len(urls) >= limit:
-            break
 
-    return urls, None if urls else "No articles found."
+    return urls
 
 
-async def fetch_article_content(session, url):
-    html, error = await fetch_html(session, url)
-    if error or html is None:
-        return "", "", "", None, error
-
-    soup = BeautifulSoup(html, "html.parser")
+def parse_article(html):
+    soup = BeautifulSoup(html, "html.parser", parse_only=ARTICLE_STRAINER)
     title = soup.find("h1").get_text(strip=True) if soup.find("h1") else "Untitled"
 
     # Get hero image from <meta property="og:image">
@@ -112,7 +125,76 @@ async def fetch_article_content(session, url):
         except Exception:
             published = datetime.utcnow()
 
-    return title, content, image, published, None
+    # Plain JSON-friendly data so it can be stored in http_cache.
+    return {
+        "title": title,
+        "content": content,
+        "image": image,
+        "published": published.isoformat() if published else None,
+    }
+
+
+class NewsLinkCollector(HTMLParser):
+    """Incremental index parser: collects news links chunk by chunk until it has `limit`."""
+
+    def __init__(self, limit):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.urls = []
+
+    @property
+    def done(self):
+        return len(self.urls) >= self.limit
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a" or self.done:
+            return
+        href = dict(attrs).get("href") or ""
+        if href.startswith(NEWS_PREFIX) and href not in self.urls:
+            self.urls.append(href)
+
+    def result(self):
+        return self.urls
+
+
+async def fetch_news_urls(session, limit=5, stream=True):
+    """Returns (urls, changed, error); `changed` is False when the index matched http_cache.
+
+    By default the index is streamed and the download stops once `limit`
+    links have been seen; stream=False parses the whole page in the pool.
+    """
+    if stream:
+        urls, changed, error = await fetch_parsed(session, NEWS_INDEX, stream_parser=NewsLinkCollector(limit))
+    else:
+        urls, changed, error = await fetch_parsed(session, NEWS_INDEX, parse_news_urls)
+    if error or urls is None:
+        return [], False, error or "Failed to fetch news index."
+
+    urls = urls[:limit]
+    return urls, changed, None if urls else "No articles found."
+
+
+async def fetch_article_content(session, url, timeout=REQUEST_TIMEOUT_SECONDS):
+    article, _, error = await fetch_parsed(session, url, parse_article, timeout=timeout)
+    if error or article is None:
+        return "", "", "", None, error
+
+    published = datetime.fromisoformat(article["published"]) if article["published"] else None
+    return article["title"], article["content"], article["image"], published, None
+
+
+async def fetch_articles(session, urls, concurrency=ARTICLE_CONCURRENCY, timeout=REQUEST_TIMEOUT_SECONDS):
+    """Fetch several articles concurrently. Results keep the order of `urls`."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_one(url):
+        async with semaphore:
+            try:
+                return await asyncio.wait_for(fetch_article_content(session, url, timeout=timeout), timeout)
+            except asyncio.TimeoutError:
+                return "", "", "", None, f"Timed out after {timeout}s"
+
+    return await asyncio.gather(*(fetch_one(url) for url in urls))
 
 
 def trim_to_paragraph_limit(text, limit=1800):
@@ -145,129 +227,159 @@ def summarize_by_word_limit(text, word_limit=100):
     return result.strip()
 
 
+ARTICLE_COLUMNS = ("url", "title", "content", "image", "published", "display_text", "summary")
+
+
+async def ingest_news(session, limit=5, concurrency=ARTICLE_CONCURRENCY):
+    """Sync the local article store with the news index. Returns an error string or None.
+
+    Article pages are only fetched when the index changed or lists a URL we
+    don't have yet; unchanged pages come back from http_cache without parsing.
+    """
+    urls, index_changed, error = await fetch_news_urls(session, limit)
+    if error:
+        return error
+
+    stored = {row[0] for row in await fetchall(DB_PATH, "SELECT url FROM articles")}
+    to_fetch = urls if index_changed else [url for url in urls if url not in stored]
+    articles = await fetch_articles(session, to_fetch, concurrency) if to_fetch else []
+
+    async with transaction(DB_PATH) as conn:
+        for url, (title, content, image, published, err) in zip(to_fetch, articles):
+            if err or not content:
+                continue
+            await conn.execute("""
+                INSERT INTO articles (url, title, content, image, published, display_text, summary, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(url) DO UPDATE SET
+                    title = excluded.title,
+                    content = excluded.content,
+                    image = excluded.image,
+                    published = excluded.published,
+                    display_text = excluded.display_text,
+                    summary = excluded.summary,
+                    fetched_at = excluded.fetched_at
+            """, (
+                url, title, content, image,
+                published.isoformat() if published else None,
+                trim_to_paragraph_limit(content),
+                summarize_by_word_limit(content)
+            ))
+        await conn.execute("UPDATE articles SET position = NULL WHERE position IS NOT NULL")
+        await conn.executemany(
+            "UPDATE articles SET position = ? WHERE url = ?",
+            [(position, url) for position, url in enumerate(urls)]
+        )
+    return None
+
+
+async def get_stored_articles(limit=5):
+    """Articles currently on the news index, in index order, straight from SQLite."""
+    rows = await fetchall(DB_PATH, f"""
+        SELECT {", ".join(ARTICLE_COLUMNS)} FROM articles
+        WHERE position IS NOT NULL
+        ORDER BY position
+        LIMIT ?
+    """, (limit,))
+    articles = []
+    for row in rows:
+        article = dict(zip(ARTICLE_COLUMNS, row))
+        article["published"] = datetime.fromisoformat(article["published"]) if article["published"] else None
+        articles.append(article)
+    return articles
+
+
+def build_news_embed(article, description, color):
+    embed = discord.Embed(
+        title=article["title"],
+        description=description,
+        color=color,
+        timestamp=article["published"] or discord.utils.utcnow(),
+        url=article["url"]
+    )
+    if article["image"]:
+        embed.set_image(url=article["image"])
+    embed.set_footer(text="Dune: Awakening News")
+    return embed
+
+
 class ReadMoreView(discord.ui.View):
     def __init__(self, url):
         super().__init__(timeout=None)
         self.add_item(discord.ui.Button(label="📖 Read Full Article", url=url))
 
 
-class DuneNews(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        init_db()
-        self.auto_post_news.start()
+class DuneNewsSource(FeedSource):
+    """HTML scraper adapter: keeps the article store in sync and offers what's on the index."""
 
-    def cog_unload(self):
-        self.auto_post_news.cancel()
+    interval = POLL_SECONDS
+    concurrency = ARTICLE_CONCURRENCY
+    retention = None  # an article can stay on the index for months
 
-    @tasks.loop(minutes=10)
-    async def auto_post_news(self):
-        await self.bot.wait_until_ready()
-        channel_id = get_config("dune_news_channel_id")
-        if not channel_id:
-            return
-        channel = self.bot.get_channel(channel_id)
-        if not isinstance(channel, discord.TextChannel):
-            return
+    def __init__(self):
+        super().__init__(SOURCE_NAME)
+
+    async def poll(self, session):
+        error = await ingest_news(session, concurrency=self.concurrency)
+        if error:
+            print(f"[DuneNews] Ingest failed: {error}")
+        return [
+            FeedItem(article["url"], article, article["published"].timestamp() if article["published"] else None)
+            for article in await get_stored_articles(limit=5)
+        ]
 
-        async with aiohttp.ClientSession() as session:
-            urls, err = await fetch_news_urls(session, limit=5)
-            if err or not urls:
-                return
+    def targets(self, item):
+        return list(get_guilds_with("dune_news_channel_id").values())
 
-            for url in urls:
-                if has_been_posted(url):
-                    continue
+    def render(self, item):
+        article = item.data
+        return build_news_embed(article, article["display_text"], 0xDEB887), ReadMoreView(article["url"])
 
-                title, content, image, published, error = await fetch_article_content(session, url)
-                if error or not content:
-                    continue
+    def post_interval(self, channel):
+        return get_config(channel.guild.id, "dune_news_post_interval")
 
-                display_text = trim_to_paragraph_limit(content)
 
-                embed = discord.Embed(
-                    title=title,
-                    description=display_text,
-                    color=0xDEB887,
-                    timestamp=published or discord.utils.utcnow(),
-                    url=url
-                )
-                if image:
-                    embed.set_image(url=image)
-                embed.set_footer(text="Dune: Awakening News")
+class DuneNews(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.engine = get_feed_engine(bot)
+        init_db()
+
+    async def cog_load(self):
+        await self.engine.register(DuneNewsSource())
 
-                await channel.send(embed=embed, view=ReadMoreView(url))
-                mark_as_posted(url)
-                break
+    async def cog_unload(self):
+        await self.engine.unregister(SOURCE_NAME)
 
-    @auto_post_news.before_loop
-    async def before_auto_post(self):
-        await self.bot.wait_until_ready()
+    async def get_articles(self, limit=5):
+        """Serve from the local store; only scrape live if it has never been filled."""
+        articles = await get_stored_articles(limit)
+        if articles:
+            return articles, None
+        error = await ingest_news(self.engine.session)
+        return await get_stored_articles(limit), error
 
     @app_commands.command(name="dune_news", description="Get the latest Dune: Awakening newsletter.")
     async def dune_news(self, interaction: discord.Interaction):
         await interaction.response.defer()
-        async with aiohttp.ClientSession() as session:
-            urls, err = await fetch_news_urls(session)
-            if err or not urls:
-                return await interaction.followup.send(f"❌ {err or 'No news found.'}")
-
-            for url in urls:
-                title, content, image, published, error = await fetch_article_content(session, url)
-                if error or not content:
-                    continue
-
-                display_text = trim_to_paragraph_limit(content)
+        articles, err = await self.get_articles(limit=1)
+        if not articles:
+            return await interaction.followup.send(f"❌ {err or 'Could not fetch any valid news posts.'}")
 
-                embed = discord.Embed(
-                    title=title,
-                    description=display_text,
-                    color=0xDEB887,
-                    timestamp=published or discord.utils.utcnow(),
-                    url=url
-                )
-                if image:
-                    embed.set_image(url=image)
-                embed.set_footer(text="Dune: Awakening News")
-
-                return await interaction.followup.send(embed=embed, view=ReadMoreView(url))
-
-            await interaction.followup.send("❌ Could not fetch any valid news posts.")
+        article = articles[0]
+        embed = build_news_embed(article, article["display_text"], 0xDEB887)
+        await interaction.followup.send(embed=embed, view=ReadMoreView(article["url"]))
 
     @app_commands.command(name="dune_news_summary", description="Summarize the last 3 Dune: Awakening posts.")
     async def dune_news_summary(self, interaction: discord.Interaction):
         await interaction.response.defer()
-        async with aiohttp.ClientSession() as session:
-            urls, err = await fetch_news_urls(session)
-            if err or not urls:
-                return await interaction.followup.send(f"❌ {err or 'No news found.'}")
-
-            sent = 0
-            for url in urls:
-                title, content, image, published, error = await fetch_article_content(session, url)
-                if error or not content:
-                    continue
-
-                summary = summarize_by_word_limit(content)
-
-                embed = discord.Embed(
-                    title=title,
-                    description=summary,
-                    color=discord.Color.dark_gold(),
-                    timestamp=published or discord.utils.utcnow(),
-                    url=url
-                )
-                if image:
-                    embed.set_image(url=image)
-                embed.set_footer(text="Dune: Awakening News")
-
-                await interaction.followup.send(embed=embed, view=ReadMoreView(url))
-                sent += 1
-                if sent >= 3:
-                    break
-
-            if sent == 0:
-                await interaction.followup.send("❌ No valid summaries found.")
+        articles, err = await self.get_articles(limit=3)
+        if not articles:
+            return await interaction.followup.send(f"❌ {err or 'No valid summaries found.'}")
+
+        for article in articles:
+            embed = build_news_embed(article, article["summary"], discord.Color.dark_gold())
+            await interaction.followup.send(embed=embed, view=ReadMoreView(article["url"]))
 
 
 async def setup(bot):
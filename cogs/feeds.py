@@ -0,0 +1,84 @@
+# cogs/feeds.py
+
+import discord
+from discord.ext import commands
+from discord import app_commands
+
+from database.config_schema import valid_entries
+from database.config_store import get_config, set_config
+from feeds.engine import get_feed_engine
+from feeds.rss import RssSource, get_feed_subscriptions, MAX_FEEDS_PER_GUILD
+
+
+class Feeds(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.engine = get_feed_engine(bot)
+        self.urls = set()  # RSS urls currently registered with the engine
+
+    async def cog_load(self):
+        await self.sync_sources()
+
+    async def cog_unload(self):
+        for url in list(self.urls):
+            await self.engine.unregister(f"rss:{url}")
+        self.urls.clear()
+
+    async def sync_sources(self):
+        """Register one source per subscribed URL, however many guilds follow it."""
+        wanted = set(get_feed_subscriptions())
+        for url in self.urls - wanted:
+            await self.engine.unregister(f"rss:{url}")
+        for url in wanted - self.urls:
+            await self.engine.register(RssSource(url))
+        self.urls = wanted
+
+    @app_commands.command(name="feed_add", description="(ADMIN ONLY) Post an RSS/Atom feed in this channel.")
+    @app_commands.describe(url="The feed URL")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def feed_add(self, interaction: discord.Interaction, url: str):
+        if not isinstance(interaction.channel, discord.TextChannel):
+            return await interaction.response.send_message("❌ Must be used in a text channel.", ephemeral=True)
+        if not url.startswith(("https://", "http://")):
+            return await interaction.response.send_message("❌ That doesn't look like a feed URL.", ephemeral=True)
+
+        feeds = valid_entries("rss_feeds", get_config(interaction.guild_id, "rss_feeds"))
+        if any(feed["url"] == url and feed["channel_id"] == interaction.channel.id for feed in feeds):
+            return await interaction.response.send_message("ℹ️ This channel already follows that feed.", ephemeral=True)
+        if len(feeds) >= MAX_FEEDS_PER_GUILD:
+            return await interaction.response.send_message(
+                f"❌ This server already follows {MAX_FEEDS_PER_GUILD} feeds.", ephemeral=True
+            )
+
+        feeds.append({"url": url, "channel_id": interaction.channel.id})
+        await set_config(interaction.guild_id, "rss_feeds", feeds)
+        await self.sync_sources()
+        self.engine.poll_soon(f"rss:{url}")
+        await interaction.response.send_message(f"📰 Following <{url}> in {interaction.channel.mention}.", ephemeral=True)
+
+    @app_commands.command(name="feed_remove", description="(ADMIN ONLY) Stop posting an RSS/Atom feed.")
+    @app_commands.describe(url="The feed URL")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def feed_remove(self, interaction: discord.Interaction, url: str):
+        feeds = valid_entries("rss_feeds", get_config(interaction.guild_id, "rss_feeds"))
+        remaining = [feed for feed in feeds if feed["url"] != url]
+        if len(remaining) == len(feeds):
+            return await interaction.response.send_message("❌ This server doesn't follow that feed.", ephemeral=True)
+
+        await set_config(interaction.guild_id, "rss_feeds", remaining or None)
+        await self.sync_sources()
+        await interaction.response.send_message(f"🗑️ Stopped following <{url}>.", ephemeral=True)
+
+    @app_commands.command(name="feed_list", description="List the RSS/Atom feeds this server follows.")
+    async def feed_list(self, interaction: discord.Interaction):
+        feeds = valid_entries("rss_feeds", get_config(interaction.guild_id, "rss_feeds"))
+        if not feeds:
+            return await interaction.response.send_message("ℹ️ No feeds yet. Add one with `/feed_add`.", ephemeral=True)
+
+        lines = [f"• <{feed['url']}> → <#{feed['channel_id']}>" for feed in feeds]
+        embed = discord.Embed(title="📰 Followed Feeds", description="\n".join(lines), color=discord.Color.teal())
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Feeds(bot))
@@ -1,16 +1,35 @@
 # cogs/reddit_mirror.py
 
 import discord
-from discord.ext import commands, tasks
-import praw
+from discord.ext import commands
+import asyncpraw
 import os
+import re
+import time
+from collections import OrderedDict
 from dotenv import load_dotenv
 
 from discord import app_commands
-from database.config_store import get_config, set_config
+from database.config_schema import valid_entries
+from database.config_store import get_config, get_guilds_with, set_config
+from database.dedupe_store import get_cursor, set_cursor, scope_seen_items
+from feeds.engine import FeedItem, FeedSource, get_feed_engine
 
 load_dotenv()
 
+SOURCE_NAME = "reddit"
+PAGE_SIZE = 100            # Reddit's maximum listing page
+MAX_PAGES_PER_POLL = 5     # catch-up budget for a single poll
+FIRST_POLL_LIMIT = 5       # how far back to look when there is no cursor yet
+RESYNC_AFTER_EMPTY_POLLS = 10  # re-anchor in case the cursor post was deleted
+TARGET_POSTS_PER_POLL = 3  # adaptive interval aims for about this many new posts per poll
+POLL_MIN_SECONDS = int(os.getenv("REDDIT_POLL_MIN_SECONDS", "60"))
+POLL_MAX_SECONDS = int(os.getenv("REDDIT_POLL_MAX_SECONDS", "600"))
+WATCH_BATCH_SIZE = 100     # fullnames per info() call, Reddit's maximum
+WATCH_MAX_AGE_SECONDS = int(float(os.getenv("REDDIT_WATCH_MAX_AGE_HOURS", "24")) * 3600)
+MAX_SUBREDDITS_PER_GUILD = 25
+SUBREDDIT_NAME = re.compile(r"^[A-Za-z0-9_]{2,21}$")
+
 
 class RedditGalleryView(discord.ui.View):
     def __init__(self, images: list[str], embed: discord.Embed, author_tag: str):
@@ -38,33 +57,78 @@ class RedditGalleryView(discord.ui.View):
         await interaction.response.edit_message(embed=self.embed, view=self)
 
 
-class RedditMirror(commands.Cog):
-    def __init__(self, bot):
+class RedditSource(FeedSource):
+    """Reddit listing adapter: every followed subreddit in one cursor-paged sub1+sub2 /new listing,
+    plus a watchlist of posts still short of some channel's upvote threshold.
+
+    Dedupe ids are "<submission id>@<channel id>", so a post can reach a
+    low-threshold channel first and a high-threshold one later.
+    """
+
+    interval = 90
+
+    def __init__(self, bot, subreddit_name: str = None, channel_id: int = None):
+        super().__init__(SOURCE_NAME)
         self.bot = bot
-        self.subreddit_name = os.getenv("REDDIT_SUBREDDIT")
-        self.channel_id = int(os.getenv("REDDIT_CHANNEL_ID"))
+        # REDDIT_SUBREDDIT / REDDIT_CHANNEL_ID: a default route on top of the per-guild config.
+        self.subreddit_name = subreddit_name
+        self.channel_id = channel_id
         self.default_min_upvotes = 20
-
+        self.reddit = None
+        self.listing = None  # "sub1+sub2" the cursor belongs to
+        self.cursor = None  # fullname of the newest submission already ingested
+        self.empty_polls = 0
+        self.last_poll_at = None
+        self.watchlist = OrderedDict()  # {fullname: created_utc} for posts still below the threshold
+
+    async def start(self, session):
+        # Rides on the engine's session; asyncpraw only sets its User-Agent as a default header
+        # and every scraper request passes its own.
         try:
-            self.reddit = praw.Reddit(
+            self.reddit = asyncpraw.Reddit(
                 client_id=os.getenv("REDDIT_CLIENT_ID"),
                 client_secret=os.getenv("REDDIT_CLIENT_SECRET"),
                 username=os.getenv("REDDIT_USERNAME"),
                 password=os.getenv("REDDIT_PASSWORD"),
-                user_agent=os.getenv("REDDIT_USER_AGENT")
+                user_agent=os.getenv("REDDIT_USER_AGENT"),
+                requestor_kwargs={"session": session}
             )
         except Exception as e:
-            print(f"[RedditMirror] PRAW initialization failed: {e}")
+            print(f"[RedditMirror] asyncpraw initialization failed: {e}")
             self.reddit = None
 
-        self.posted_ids = set()
-        self.check_reddit.start()
+    async def close(self):
+        # Not reddit.close(): that would close the shared session.
+        self.reddit = None
 
-    def cog_unload(self):
-        self.check_reddit.cancel()
+    def get_min_upvotes(self, guild_id: int):
+        min_upvotes = get_config(guild_id, "reddit_min_upvotes")
+        return min_upvotes if min_upvotes is not None else self.default_min_upvotes
 
-    def get_min_upvotes(self):
-        return get_config("reddit_min_upvotes") or self.default_min_upvotes
+    def get_routes(self, guild_id: int = None) -> dict:
+        """{subreddit: [(channel_id, min_upvotes), ...]} for guilds with the mirror enabled."""
+        routes = {}
+        for gid, subreddits in get_guilds_with("reddit_subreddits").items():
+            if guild_id is not None and gid != guild_id:
+                continue
+            if not get_config(gid, "reddit_enabled"):
+                continue
+            # Malformed routes are skipped so one guild's bad value can't stop every guild's mirror.
+            for name, route in valid_entries("reddit_subreddits", subreddits):
+                min_upvotes = route.get("min_upvotes")
+                if min_upvotes is None:
+                    min_upvotes = self.get_min_upvotes(gid)
+                routes.setdefault(name.lower(), []).append((route["channel_id"], min_upvotes))
+
+        if self.subreddit_name and self.channel_id:
+            channel = self.bot.get_channel(self.channel_id)
+            if isinstance(channel, discord.TextChannel) and guild_id in (None, channel.guild.id) \
+                    and get_config(channel.guild.id, "reddit_enabled") \
+                    and self.subreddit_name.lower() not in (get_config(channel.guild.id, "reddit_subreddits") or {}):
+                routes.setdefault(self.subreddit_name.lower(), []).append(
+                    (self.channel_id, self.get_min_upvotes(channel.guild.id))
+                )
+        return routes
 
     def extract_gallery_images(self, submission) -> list[str]:
         images = []
@@ -89,7 +153,7 @@ class RedditMirror(commands.Cog):
             url=post_url,
             color=discord.Color.orange()
         )
-        embed.set_author(name=f"Reddit /r/{self.subreddit_name}")
+        embed.set_author(name=f"Reddit /r/{submission.subreddit.display_name}")
         embed.set_footer(text=f"Posted by u/{submission.author}")
 
         if submission.selftext and len(submission.selftext) < 1024:
@@ -102,88 +166,218 @@ class RedditMirror(commands.Cog):
 
         return embed
 
-    @tasks.loop(minutes=1.5)
-    async def check_reddit(self):
-        if not get_config("reddit_enabled"):
-            return
-
-        if self.reddit is None:
-            return
+    async def fetch_page(self, listing: str, **params) -> list:
+        """One /new request, newest first. ListingGenerator would follow a short page's
+        `after` with a second request, which Reddit answers with the same `before` page."""
+        page = await self.reddit.get(f"r/{listing}/new", params=params)
+        return list(page.children) if page else []
+
+    async def fetch_new_submissions(self, listing: str) -> list:
+        """Everything newer than the cursor, oldest first. Pages forward with before= until caught up."""
+        if self.cursor is None:
+            return list(reversed(await self.fetch_page(listing, limit=FIRST_POLL_LIMIT)))
+
+        submissions = {}
+        cursor = self.cursor
+        for _ in range(MAX_PAGES_PER_POLL):
+            batch = await self.fetch_page(listing, before=cursor, limit=PAGE_SIZE)
+            if not batch:
+                break
+            # Each page is newest-first and directly follows the cursor.
+            for submission in reversed(batch):
+                submissions.setdefault(submission.fullname, submission)
+            cursor = batch[0].fullname
+            if len(batch) < PAGE_SIZE:
+                break
+        return list(submissions.values())
+
+    def adapt_interval(self, new_posts: int):
+        now = time.monotonic()
+        elapsed = now - self.last_poll_at if self.last_poll_at else self.interval
+        self.last_poll_at = now
+
+        if new_posts:
+            rate = new_posts / max(elapsed, 1)
+            interval = TARGET_POSTS_PER_POLL / rate
+        else:
+            interval = self.interval * 1.5
+        # The engine reads this back when it schedules the next poll.
+        self.interval = min(max(interval, POLL_MIN_SECONDS), POLL_MAX_SECONDS)
+
+    def route(self, submission, routes: dict) -> list[FeedItem]:
+        """One item per channel whose threshold the post meets; watch it if any channel is still waiting."""
+        items = []
+        waiting = False
+        for channel_id, min_upvotes in routes.get(submission.subreddit.display_name.lower(), []):
+            if submission.score >= min_upvotes:
+                items.append(FeedItem(f"{submission.id}@{channel_id}", submission, submission.created_utc, channel_id))
+            else:
+                waiting = True
+        if waiting:
+            self.watchlist[submission.fullname] = submission.created_utc
+        return items
+
+    async def poll(self, session):
+        routes = self.get_routes()
+        if not routes or self.reddit is None:
+            return []
+
+        # The cursor is only meaningful for the listing it came from.
+        listing = "+".join(sorted(routes))
+        if listing != self.listing:
+            self.listing = listing
+            self.cursor = await get_cursor(f"{SOURCE_NAME}:{listing}")
+            self.empty_polls = 0
+
+        if self.empty_polls >= RESYNC_AFTER_EMPTY_POLLS:
+            self.cursor = None
+            self.empty_polls = 0
 
         try:
-            subreddit = self.reddit.subreddit(self.subreddit_name)
-            submissions = list(subreddit.new(limit=5))
+            submissions = await self.fetch_new_submissions(listing)
         except Exception as e:
             print(f"[RedditMirror] Failed to fetch subreddit posts: {e}")
-            return
+            return []
 
-        channel = self.bot.get_channel(self.channel_id)
-        if channel is None or not isinstance(channel, discord.TextChannel):
-            return
+        self.adapt_interval(len(submissions))
 
-        min_upvotes = self.get_min_upvotes()
+        if submissions:
+            self.empty_polls = 0
+            self.cursor = submissions[-1].fullname
+            await set_cursor(f"{SOURCE_NAME}:{listing}", self.cursor)
+        else:
+            self.empty_polls += 1
 
+        items = []
         for submission in submissions:
-            if submission.id in self.posted_ids:
-                continue
-            if submission.score < min_upvotes:
-                continue
+            items.extend(self.route(submission, routes))
+        for submission in await self.recheck_watchlist():
+            items.extend(self.route(submission, routes))
+        return items
+
+    async def recheck_watchlist(self) -> list:
+        """Re-score pending posts with one info() call; route() puts back the ones still waiting."""
+        cutoff = time.time() - WATCH_MAX_AGE_SECONDS
+        for fullname, created_utc in list(self.watchlist.items()):
+            if created_utc < cutoff:
+                del self.watchlist[fullname]
+        if not self.watchlist:
+            return []
+
+        batch = list(self.watchlist)[:WATCH_BATCH_SIZE]
+        try:
+            refreshed = [submission async for submission in self.reddit.info(fullnames=batch)]
+        except Exception as e:
+            print(f"[RedditMirror] Failed to re-score watchlist: {e}")
+            return []
 
-            self.posted_ids.add(submission.id)
+        # Anything Reddit didn't return was removed or deleted. The rest go to the
+        # back of the queue when re-watched, so a backlog over 100 posts is cycled through.
+        for fullname in batch:
+            self.watchlist.pop(fullname, None)
+        return refreshed
 
-            if getattr(submission, "is_gallery", False):
-                images = self.extract_gallery_images(submission)
-                if not images:
-                    continue
-                embed = self.create_embed_from_submission(submission, image_override=images[0])
-                view = RedditGalleryView(images, embed, f"Posted by u/{submission.author}")
-                try:
-                    await channel.send(embed=embed, view=view)
-                except Exception as e:
-                    print(f"[RedditMirror] Failed to send gallery post {submission.id}: {e}")
-            else:
-                embed = self.create_embed_from_submission(submission)
-                try:
-                    await channel.send(embed=embed)
-                except Exception as e:
-                    print(f"[RedditMirror] Failed to send embed for {submission.id}: {e}")
+    def targets(self, item):
+        return [item.route]
+
+    def render(self, item):
+        submission = item.data
+        if getattr(submission, "is_gallery", False):
+            images = self.extract_gallery_images(submission)
+            if not images:
+                return None
+            embed = self.create_embed_from_submission(submission, image_override=images[0])
+            return embed, RedditGalleryView(images, embed, f"Posted by u/{submission.author}")
+        return self.create_embed_from_submission(submission), None
+
+
+class RedditMirror(commands.Cog):
+    def __init__(self, bot):
+        self.bot = bot
+        self.engine = get_feed_engine(bot)
+        self.source = RedditSource(bot, os.getenv("REDDIT_SUBREDDIT"), int(os.getenv("REDDIT_CHANNEL_ID") or 0) or None)
+        if self.source.channel_id:
+            # Ids posted before routing existed all went to the env channel.
+            scope_seen_items(SOURCE_NAME, str(self.source.channel_id))
 
-    @check_reddit.before_loop
-    async def before_check_reddit(self):
-        await self.bot.wait_until_ready()
+    async def cog_load(self):
+        await self.engine.register(self.source)
+
+    async def cog_unload(self):
+        await self.engine.unregister(SOURCE_NAME)
 
     @app_commands.command(name="reddit_latest", description="Post the latest Reddit post that meets the upvote threshold.")
     async def reddit_latest(self, interaction: discord.Interaction):
         await interaction.response.defer()
 
-        if self.reddit is None:
+        source = self.source
+        if source.reddit is None:
             await interaction.followup.send("❌ Reddit API not initialized.")
             return
 
-        subreddit = self.reddit.subreddit(self.subreddit_name)
-        min_upvotes = self.get_min_upvotes()
+        routes = source.get_routes(interaction.guild_id)
+        if not routes and source.subreddit_name:
+            routes = {source.subreddit_name.lower(): [(None, source.get_min_upvotes(interaction.guild_id))]}
+        if not routes:
+            await interaction.followup.send("❌ This server doesn't follow any subreddits.")
+            return
 
         try:
-            for submission in subreddit.new(limit=10):
-                if submission.score < min_upvotes:
+            subreddit = await source.reddit.subreddit("+".join(sorted(routes)))
+            async for submission in subreddit.new(limit=10):
+                thresholds = [min_upvotes for _, min_upvotes in routes.get(submission.subreddit.display_name.lower(), [])]
+                if not thresholds or submission.score < min(thresholds):
                     continue
 
-                if getattr(submission, "is_gallery", False):
-                    images = self.extract_gallery_images(submission)
-                    if not images:
-                        continue
-                    embed = self.create_embed_from_submission(submission, image_override=images[0])
-                    view = RedditGalleryView(images, embed, f"Posted by u/{submission.author}")
-                    await interaction.followup.send(embed=embed, view=view)
-                else:
-                    embed = self.create_embed_from_submission(submission)
+                message = source.render(FeedItem(submission.id, submission))
+                if message is None:
+                    continue
+                embed, view = message
+                if view is None:
                     await interaction.followup.send(embed=embed)
+                else:
+                    await interaction.followup.send(embed=embed, view=view)
                 return
 
             await interaction.followup.send("❌ No recent posts meet the upvote threshold.")
         except Exception as e:
             await interaction.followup.send(f"❌ Failed to fetch Reddit posts: {e}")
 
+    @app_commands.command(name="reddit_follow", description="(ADMIN ONLY) Mirror a subreddit into this channel.")
+    @app_commands.describe(subreddit="Subreddit name, without r/", min_upvotes="Upvotes a post needs (defaults to reddit_min_upvotes)")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def reddit_follow(self, interaction: discord.Interaction, subreddit: str,
+                            min_upvotes: app_commands.Range[int, 0, None] = None):
+        if not isinstance(interaction.channel, discord.TextChannel):
+            return await interaction.response.send_message("❌ Must be used in a text channel.", ephemeral=True)
+        name = subreddit.strip().removeprefix("r/").lower()
+        if not SUBREDDIT_NAME.match(name):
+            return await interaction.response.send_message("❌ That isn't a valid subreddit name.", ephemeral=True)
+
+        subreddits = dict(valid_entries("reddit_subreddits", get_config(interaction.guild_id, "reddit_subreddits")))
+        if name not in subreddits and len(subreddits) >= MAX_SUBREDDITS_PER_GUILD:
+            return await interaction.response.send_message(
+                f"❌ This server already follows {MAX_SUBREDDITS_PER_GUILD} subreddits.", ephemeral=True
+            )
+        subreddits[name] = {"channel_id": interaction.channel.id, "min_upvotes": min_upvotes}
+        await set_config(interaction.guild_id, "reddit_subreddits", subreddits)
+        self.engine.poll_soon(SOURCE_NAME)
+        message = f"🔁 Mirroring r/{name} into {interaction.channel.mention}."
+        if not get_config(interaction.guild_id, "reddit_enabled"):
+            message += "\n⚠️ The Reddit mirror is off for this server, so nothing will be posted until `reddit_enabled` is turned on (`/toggle_setting reddit_enabled`)."
+        await interaction.response.send_message(message, ephemeral=True)
+
+    @app_commands.command(name="reddit_unfollow", description="(ADMIN ONLY) Stop mirroring a subreddit.")
+    @app_commands.describe(subreddit="Subreddit name, without r/")
+    @app_commands.checks.has_permissions(administrator=True)
+    async def reddit_unfollow(self, interaction: discord.Interaction, subreddit: str):
+        name = subreddit.strip().removeprefix("r/").lower()
+        subreddits = dict(valid_entries("reddit_subreddits", get_config(interaction.guild_id, "reddit_subreddits")))
+        if subreddits.pop(name, None) is None:
+            return await interaction.response.send_message(f"❌ This server doesn't follow r/{name}.", ephemeral=True)
+        await set_config(interaction.guild_id, "reddit_subreddits", subreddits or None)
+        await interaction.response.send_message(f"🗑️ Stopped mirroring r/{name}.", ephemeral=True)
+
 
 async def setup(bot):
     await bot.add_cog(RedditMirror(bot))
@@ -5,6 +5,7 @@ from discord.ext import commands
 from discord import app_commands
 
 from database.config_store import get_config, set_config, get_all_config
+from database.config_schema import parse_config_value
 
 
 class Settings(commands.Cog):
@@ -14,8 +15,8 @@ class Settings(commands.Cog):
     @app_commands.command(name="show_settings", description="(ADMIN ONLY) Show all current bot settings.")
     @app_commands.checks.has_permissions(administrator=True)
     async def show_settings(self, interaction: discord.Interaction):
-        config = get_all_config()
         guild = interaction.guild
+        config = get_all_config(guild.id)
 
         friendly_names = {
             "counting_channel_id": "Counting Channel",
@@ -56,18 +57,18 @@ class Settings(commands.Cog):
     @app_commands.describe(key="The config key to toggle (must be a boolean)")
     @app_commands.checks.has_permissions(administrator=True)
     async def toggle_setting(self, interaction: discord.Interaction, key: str):
-        value = get_config(key)
+        value = get_config(interaction.guild_id, key)
         if not isinstance(value, bool):
             await interaction.response.send_message(f"❌ `{key}` is not a toggleable boolean.", ephemeral=True)
             return
         new_value = not value
-        set_config(key, new_value)
+        await set_config(interaction.guild_id, key, new_value)
         await interaction.response.send_message(f"✅ `{key}` is now set to `{new_value}`.", ephemeral=True)
 
     @app_commands.command(name="set_counting_channel", description="(ADMIN ONLY) Set this channel as the counting channel.")
     @app_commands.checks.has_permissions(administrator=True)
     async def set_counting_channel(self, interaction: discord.Interaction):
-        set_config("counting_channel_id", interaction.channel.id)
+        await set_config(interaction.guild_id, "counting_channel_id", interaction.channel.id)
         await interaction.response.send_message(
             f"🔢 Counting channel set to {interaction.channel.mention}.", ephemeral=True
         )
@@ -77,10 +78,17 @@ class Settings(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     async def set_config_command(self, interaction: discord.Interaction, key: str, value: str):
         try:
-            parsed_value = eval(value, {"__builtins__": {}}, {})
-        except Exception:
-            parsed_value = value
-        set_config(key, parsed_value)
+            parsed_value = parse_config_value(key, value)
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+            return
+
+        # The counting game owns these two while it is loaded; writing only the config would be overwritten.
+        counting = self.bot.get_cog("CountingGame")
+        if key in ("current_count", "last_counter_id") and counting is not None:
+            await counting.set_state_value(interaction.guild_id, key, parsed_value)
+        else:
+            await set_config(interaction.guild_id, key, parsed_value)
         await interaction.response.send_message(
             f"🛠️ `{key}` updated to `{parsed_value}`.", ephemeral=True
         )
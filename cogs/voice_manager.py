@@ -1,79 +1,272 @@
 # cogs/voice_manager.py
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
-from database.config_store import get_config, set_config
+from database.config_store import get_config, get_guilds_with, set_config
+from database.voice_store import TempChannelRegistry
 import asyncio
-import time
+import weakref
 
 CHANNEL_TIMEOUT_SECONDS = 5  # seconds before deleting empty temp VC
+DELETE_BATCH_SIZE = 5        # expired channels deleted together
+DELETE_BATCH_PAUSE = 1.0     # seconds between batches, keeps a mass exodus clear of the global rate limit
+POOL_CHANNEL_NAME = "Spare Channel"  # idle pool channels are hidden, so members never see this
+POOL_HANDOUT_TIMEOUT = 2.0   # a rename stuck behind Discord's 2-per-10-minutes limit falls back to creating
+POOL_REFILL_SECONDS = 60     # idle pools are topped up at least this often
+POOL_CREATE_PAUSE = 1.0      # seconds between refill creations
+
+
+def owner_overwrites(member):
+    return {
+        member.guild.default_role: discord.PermissionOverwrite(connect=True, view_channel=True),
+        member: discord.PermissionOverwrite(manage_channels=True, connect=True, view_channel=True)
+    }
+
+
+def idle_overwrites(guild):
+    return {
+        guild.default_role: discord.PermissionOverwrite(connect=False, view_channel=False),
+        guild.me: discord.PermissionOverwrite(connect=True, view_channel=True, manage_channels=True, move_members=True)
+    }
 
 
 class VoiceManager(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.temp_channels = {}  # {channel_id: empty_timestamp}
-        self.cleanup_task.start()
+        self.registry = TempChannelRegistry()
+        self.expiry = {}        # {channel_id: TimerHandle}, only for temp VCs that are empty right now
+        self.delete_queue = {}  # {channel_id: None}, expired and waiting for the deleter, oldest first
+        self.delete_wakeup = asyncio.Event()
+        self.member_locks = weakref.WeakValueDictionary()  # {(guild_id, member_id): Lock}, gone once unused
+        self.refill_wakeup = asyncio.Event()
+        self.deleter = None
+        self.reclaimer = None
+        self.refiller = None
+
+    async def cog_load(self):
+        await self.registry.load()
+        self.deleter = asyncio.create_task(self.delete_expired())
+        self.reclaimer = asyncio.create_task(self.reclaim_orphans())
+        self.refiller = asyncio.create_task(self.refill_pools())
+
+    async def cog_unload(self):
+        for handle in self.expiry.values():
+            handle.cancel()
+        self.expiry.clear()
+        for task in (self.deleter, self.reclaimer, self.refiller):
+            if task is not None:
+                task.cancel()
+
+    def schedule_expiry(self, channel_id: int):
+        self.cancel_expiry(channel_id)
+        loop = asyncio.get_running_loop()
+        self.expiry[channel_id] = loop.call_later(CHANNEL_TIMEOUT_SECONDS, self.expire, channel_id)
+
+    def cancel_expiry(self, channel_id: int):
+        handle = self.expiry.pop(channel_id, None)
+        if handle is not None:
+            handle.cancel()
+        self.delete_queue.pop(channel_id, None)
+
+    def expire(self, channel_id: int):
+        self.expiry.pop(channel_id, None)
+        self.delete_queue[channel_id] = None
+        self.delete_wakeup.set()
+
+    async def delete_expired(self):
+        """Sleeps until a timer fires, then deletes the queue in small, spaced batches."""
+        while True:
+            await self.delete_wakeup.wait()
+            self.delete_wakeup.clear()
+            while self.delete_queue:
+                batch = list(self.delete_queue)[:DELETE_BATCH_SIZE]
+                for channel_id in batch:
+                    del self.delete_queue[channel_id]
+                results = await asyncio.gather(*(self.delete_channel(cid) for cid in batch), return_exceptions=True)
+                for channel_id, result in zip(batch, results):
+                    if isinstance(result, Exception):
+                        print(f"[VoiceManager] Failed to delete channel {channel_id}: {result}")
+                if self.delete_queue:
+                    await asyncio.sleep(DELETE_BATCH_PAUSE)
+
+    async def delete_channel(self, channel_id: int):
+        channel = self.bot.get_channel(channel_id)
+        if channel is None:
+            await self.registry.remove(channel_id)
+            return
+        # Someone may have joined between the timer firing and this batch.
+        if not isinstance(channel, discord.VoiceChannel) or len(channel.members) > 0:
+            return
+        if self.pool_has_room(channel.guild.id, channel.category_id) and await self.return_to_pool(channel):
+            return
+        try:
+            await channel.delete(reason="Temporary VC expired")
+        except discord.NotFound:
+            pass
+        await self.registry.remove(channel_id)
+
+    def member_lock(self, member) -> asyncio.Lock:
+        key = (member.guild.id, member.id)
+        lock = self.member_locks.get(key)
+        if lock is None:
+            lock = asyncio.Lock()
+            self.member_locks[key] = lock
+        return lock
+
+    async def get_owned_channel(self, member):
+        channel_id = self.registry.owned_by(member.guild.id, member.id)
+        if channel_id is None:
+            return None
+        channel = member.guild.get_channel(channel_id)
+        if not isinstance(channel, discord.VoiceChannel):
+            await self.registry.remove(channel_id)
+            return None
+        return channel
+
+    async def reclaim_orphans(self):
+        """Registry rows from before a restart: forget deleted channels, expire the ones left empty."""
+        await self.bot.wait_until_ready()
+        for channel_id in list(self.registry.channels):
+            channel = self.bot.get_channel(channel_id)
+            if not isinstance(channel, discord.VoiceChannel):
+                await self.registry.remove(channel_id)
+            elif len(channel.members) == 0:
+                self.schedule_expiry(channel_id)
+        for channel_id in list(self.registry.idle):
+            if not isinstance(self.bot.get_channel(channel_id), discord.VoiceChannel):
+                await self.registry.remove(channel_id)
+
+    # ─── IDLE POOL ────────────────────────────────────
+
+    def pool_has_room(self, guild_id: int, category_id: int) -> bool:
+        size = get_config(guild_id, "voice_pool_size")
+        return bool(size) and self.registry.idle_count(guild_id, category_id) < size
 
-    def cog_unload(self):
-        self.cleanup_task.cancel()
+    async def take_pooled_channel(self, member, category):
+        """Hand out an idle channel: one edit for name and overwrites. None means create one instead."""
+        if not get_config(member.guild.id, "voice_pool_size"):
+            return None
+        category_id = category.id if category else None
+
+        while (channel_id := await self.registry.take_idle(member.guild.id, category_id)) is not None:
+            channel = member.guild.get_channel(channel_id)
+            if not isinstance(channel, discord.VoiceChannel):
+                continue
+
+            self.refill_wakeup.set()
+            edit = asyncio.ensure_future(
+                channel.edit(name=f"{member.display_name}'s Channel", overwrites=owner_overwrites(member))
+            )
+            try:
+                await asyncio.wait_for(asyncio.shield(edit), POOL_HANDOUT_TIMEOUT)
+            except asyncio.TimeoutError:
+                # Let the rename finish in the background, then hide the channel in the pool again.
+                edit.add_done_callback(lambda _: asyncio.ensure_future(self.return_to_pool(channel)))
+                return None
+            except discord.HTTPException as e:
+                # take_idle already dropped it from the registry: hide it again or delete it, never leave it
+                # untracked. Then create instead, so a channel that keeps failing isn't retried in a loop.
+                print(f"[VoiceManager] Failed to hand out pooled channel {channel_id}: {e}")
+                if not await self.return_to_pool(channel):
+                    try:
+                        await channel.delete(reason="Pooled channel could not be handed out")
+                    except discord.HTTPException as e:
+                        print(f"[VoiceManager] Failed to delete pooled channel {channel_id}: {e}")
+                return None
+            return channel
+        return None
+
+    async def return_to_pool(self, channel) -> bool:
+        """Hide an emptied channel in the pool. The stale name stays: renames are rate limited, overwrites aren't."""
+        try:
+            await channel.edit(overwrites=idle_overwrites(channel.guild))
+        except discord.HTTPException as e:
+            print(f"[VoiceManager] Failed to return channel {channel.id} to the pool: {e}")
+            return False
+        await self.registry.remove(channel.id)
+        await self.registry.add_idle(channel.id, channel.guild.id, channel.category_id)
+        return True
+
+    async def refill_pools(self):
+        await self.bot.wait_until_ready()
+        while True:
+            self.refill_wakeup.clear()
+            guild_ids = set(get_guilds_with("voice_pool_size")) | {guild_id for guild_id, _ in self.registry.pools}
+            for guild_id in guild_ids:
+                try:
+                    await self.refill_pool(guild_id)
+                except Exception as e:
+                    print(f"[VoiceManager] Failed to refill the pool for guild {guild_id}: {e}")
+
+            try:
+                await asyncio.wait_for(self.refill_wakeup.wait(), POOL_REFILL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+
+    async def refill_pool(self, guild_id: int):
+        """Create or delete idle channels until the entry channel's category holds voice_pool_size of them."""
+        guild = self.bot.get_guild(guild_id)
+        entry_channel_id = get_config(guild_id, "voice_entry_channel_id")
+        entry = guild.get_channel(entry_channel_id) if guild and entry_channel_id else None
+        if not isinstance(entry, discord.VoiceChannel):
+            return
+
+        size = get_config(guild_id, "voice_pool_size") or 0
+        category_id = entry.category_id
+        while self.registry.idle_count(guild_id, category_id) < size:
+            channel = await guild.create_voice_channel(
+                POOL_CHANNEL_NAME, category=entry.category, overwrites=idle_overwrites(guild)
+            )
+            await self.registry.add_idle(channel.id, guild_id, category_id)
+            await asyncio.sleep(POOL_CREATE_PAUSE)
+
+        while self.registry.idle_count(guild_id, category_id) > size:
+            channel_id = await self.registry.take_idle(guild_id, category_id)
+            channel = guild.get_channel(channel_id)
+            if channel is not None:
+                await channel.delete(reason="Temporary VC pool shrunk")
 
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
-        entry_channel_id = get_config("voice_entry_channel_id")
+        entry_channel_id = get_config(member.guild.id, "voice_entry_channel_id")
         if not entry_channel_id:
             return
 
         # ─── TEMP VC CREATION ─────────────────────────────
         if after.channel and after.channel.id == entry_channel_id:
-            category = after.channel.category
-            channel_name = f"{member.display_name}'s Channel"
-
-            existing_channel = discord.utils.get(category.voice_channels, name=channel_name)
-            if existing_channel:
-                await member.move_to(existing_channel)
-                return
-
-            new_channel = await category.create_voice_channel(
-                name=channel_name,
-                overwrites={
-                    member.guild.default_role: discord.PermissionOverwrite(connect=True, view_channel=True),
-                    member: discord.PermissionOverwrite(manage_channels=True, connect=True, view_channel=True)
-                }
-            )
-            await member.move_to(new_channel)
+            # A double join waits here instead of creating a second channel.
+            async with self.member_lock(member):
+                existing_channel = await self.get_owned_channel(member)
+                if existing_channel:
+                    await member.move_to(existing_channel)
+                    return
+
+                category = after.channel.category
+                new_channel = await self.take_pooled_channel(member, category)
+                if new_channel is None:
+                    new_channel = await category.create_voice_channel(
+                        name=f"{member.display_name}'s Channel",
+                        overwrites=owner_overwrites(member)
+                    )
+                await self.registry.add(new_channel.id, member.guild.id, member.id)
+                await member.move_to(new_channel)
 
         # ─── TEMP VC EMPTY TRACKING ───────────────────────
-        if before.channel and before.channel.name.endswith("'s Channel"):
+        if before.channel and before.channel.id in self.registry:
             if len(before.channel.members) == 0:
-                self.temp_channels[before.channel.id] = time.time()
+                self.schedule_expiry(before.channel.id)
             else:
-                self.temp_channels.pop(before.channel.id, None)
-
-        if after.channel and after.channel.name.endswith("'s Channel"):
-            self.temp_channels.pop(after.channel.id, None)
-
-    @tasks.loop(seconds=5)
-    async def cleanup_task(self):
-        now = time.time()
-        to_delete = []
-        for channel_id, emptied_at in self.temp_channels.items():
-            if now - emptied_at >= CHANNEL_TIMEOUT_SECONDS:
-                channel = self.bot.get_channel(channel_id)
-                if channel and isinstance(channel, discord.VoiceChannel) and len(channel.members) == 0:
-                    try:
-                        await channel.delete(reason="Temporary VC expired")
-                        to_delete.append(channel_id)
-                    except Exception as e:
-                        print(f"[VoiceManager] Failed to delete channel {channel_id}: {e}")
-                        to_delete.append(channel_id)
-        for cid in to_delete:
-            self.temp_channels.pop(cid, None)
-
-    @cleanup_task.before_loop
-    async def before_cleanup(self):
-        await self.bot.wait_until_ready()
+                self.cancel_expiry(before.channel.id)
+
+        if after.channel and after.channel.id in self.registry:
+            self.cancel_expiry(after.channel.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        if channel.id in self.registry or channel.id in self.registry.idle:
+            self.cancel_expiry(channel.id)
+            await self.registry.remove(channel.id)
 
     # ───── SLASH COMMANDS ────────────────────────────────
 
@@ -81,7 +274,7 @@ class VoiceManager(commands.Cog):
     @app_commands.checks.has_permissions(administrator=True)
     async def set_entry_channel(self, interaction: discord.Interaction):
         if isinstance(interaction.channel, discord.VoiceChannel):
-            set_config("voice_entry_channel_id", interaction.channel.id)
+            await set_config(interaction.guild_id, "voice_entry_channel_id", interaction.channel.id)
             await interaction.response.send_message("✅ Join-to-Create voice channel set.", ephemeral=True)
         else:
             await interaction.response.send_message("❌ This must be used inside a voice channel.", ephemeral=True)
@@ -1,21 +1,79 @@
 # cogs/welcome.py
 
+import asyncio
+import io
+import time
+
 import discord
 from discord.ext import commands
 from discord import app_commands
 
 from database.config_store import get_config, set_config
+from welcome_card import CardRenderer
+
+MAX_MENTIONS_PER_MESSAGE = 50  # keeps a burst welcome well under the 2000 character limit
+
 
 class Welcome(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        self.pending = {}    # {guild_id: (channel, [member, ...])} joins waiting for the window to close
+        self.last_sent = {}  # {guild_id: monotonic time of the last welcome}
+        self.flushers = {}   # {guild_id: Task} one per guild with pending joins
+        self.stats = {"joins": 0, "messages": 0}
+        self.renderer = CardRenderer()
+
+    async def cog_load(self):
+        self.renderer.start()
+
+    async def cog_unload(self):
+        for task in self.flushers.values():
+            task.cancel()
+        self.flushers.clear()
+        for channel, members in self.pending.values():
+            await self.send_welcome(channel, members)
+        self.pending.clear()
+        self.renderer.shutdown()
+
+    def get_stats(self) -> dict:
+        stats = dict(self.stats)
+        stats["messages_saved"] = stats["joins"] - stats["messages"]
+        return stats
+
+    async def send_welcome(self, channel: discord.TextChannel, members: list):
+        self.last_sent[channel.guild.id] = time.monotonic()
+        self.stats["messages"] += 1
+
+        shown = members[:MAX_MENTIONS_PER_MESSAGE]
+        text = f"👋 Welcome to the server, {', '.join(member.mention for member in shown)}!"
+        if len(members) > len(shown):
+            text += f" (+{len(members) - len(shown)} more)"
+
+        # Cards are for single welcomes; a burst already gets one shared text message.
+        card = None
+        if len(members) == 1 and get_config(channel.guild.id, "welcome_card_enabled"):
+            card = await self.renderer.render(members[0])
+        try:
+            if card is None:
+                await channel.send(text)
+            else:
+                await channel.send(text, file=discord.File(io.BytesIO(card), filename="welcome.png"))
+        except Exception as e:
+            print(f"[Welcome] Failed to send welcome in {channel.id}: {e}")
+
+    async def flush_later(self, guild_id: int, delay: float):
+        await asyncio.sleep(delay)
+        self.flushers.pop(guild_id, None)
+        channel, members = self.pending.pop(guild_id)
+        await self.send_welcome(channel, members)
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
-        if not get_config("welcome_enabled"):
+        guild_id = member.guild.id
+        if not get_config(guild_id, "welcome_enabled"):
             return
 
-        channel_id = get_config("welcome_channel_id")
+        channel_id = get_config(guild_id, "welcome_channel_id")
         if not channel_id:
             return
 
@@ -23,20 +81,33 @@ class Welcome(commands.Cog):
         if not channel or not isinstance(channel, discord.TextChannel):
             return
 
-        await channel.send(f"👋 Welcome to the server, {member.mention}!")
+        self.stats["joins"] += 1
+        if guild_id in self.pending:
+            self.pending[guild_id][1].append(member)
+            return
+
+        # A join after a quiet spell is welcomed right away; anything inside the
+        # window after that waits and goes out together when it closes.
+        window = get_config(guild_id, "welcome_coalesce_seconds") or 0
+        wait = self.last_sent.get(guild_id, float("-inf")) + window - time.monotonic()
+        if wait <= 0:
+            await self.send_welcome(channel, [member])
+            return
+        self.pending[guild_id] = (channel, [member])
+        self.flushers[guild_id] = asyncio.create_task(self.flush_later(guild_id, wait))
 
     @app_commands.command(name="toggle_welcome", description="(ADMIN ONLY) Enable or disable welcome messages.")
     @app_commands.checks.has_permissions(administrator=True)
     async def toggle_welcome(self, interaction: discord.Interaction):
-        current = get_config("welcome_enabled") or False
-        set_config("welcome_enabled", not current)
+        current = get_config(interaction.guild_id, "welcome_enabled") or False
+        await set_config(interaction.guild_id, "welcome_enabled", not current)
         await interaction.response.send_message(f"✅ Welcome messages are now set to `{not current}`.", ephemeral=True)
 
     @app_commands.command(name="set_welcome_channel", description="(ADMIN ONLY) Set this channel for welcome messages.")
     @app_commands.checks.has_permissions(administrator=True)
     async def set_welcome_channel(self, interaction: discord.Interaction):
         if isinstance(interaction.channel, discord.TextChannel):
-            set_config("welcome_channel_id", interaction.channel.id)
+            await set_config(interaction.guild_id, "welcome_channel_id", interaction.channel.id)
             await interaction.response.send_message("📬 Welcome channel set to this channel.", ephemeral=True)
         else:
             await interaction.response.send_message("❌ Must be used in a text channel.", ephemeral=True)
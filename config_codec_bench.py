@@ -0,0 +1,56 @@
+# config_codec_bench.py
+#
+# Micro-benchmark of decoding stored config values: the typed codec in
+# database/config_schema.py against the old eval(repr(value)) storage.
+#
+#   python config_codec_bench.py [--number 200000]
+
+import argparse
+import os
+import sys
+import timeit
+
+# Representative guild_config rows: channel ids, flags, unset values, counters and a JSON setting.
+SAMPLE_VALUES = [
+    1234567890123456789,
+    True,
+    None,
+    4821,
+    "https://example.com/feed.xml",
+    [{"url": "https://example.com/feed.xml", "channel_id": 1234567890123456789}],
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time config decoding: typed codec vs eval(repr).")
+    parser.add_argument("--number", type=int, default=200_000, help="decodes per row and per path")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from database.config_schema import decode_value, encode_value
+
+    legacy_rows = [repr(value) for value in SAMPLE_VALUES]
+    codec_rows = [encode_value(value) for value in SAMPLE_VALUES]
+    for text, (tag, encoded), value in zip(legacy_rows, codec_rows, SAMPLE_VALUES):
+        assert eval(text) == decode_value(tag, encoded) == value
+
+    def decode_legacy_rows():
+        for text in legacy_rows:
+            eval(text)
+
+    def decode_codec_rows():
+        for tag, text in codec_rows:
+            decode_value(tag, text)
+
+    decodes = args.number * len(SAMPLE_VALUES)
+    results = {}
+    for label, func in (("eval(repr)", decode_legacy_rows), ("typed codec", decode_codec_rows)):
+        seconds = min(timeit.repeat(func, number=args.number, repeat=3))
+        results[label] = seconds / decodes * 1e9
+        print(f"{label:>12}: {results[label]:8.0f} ns/value")
+    print(f"Typed codec is {results['eval(repr)'] / results['typed codec']:.1f}x faster "
+          f"({len(SAMPLE_VALUES)} rows, {decodes:,} decodes per path).")
+
+
+if __name__ == "__main__":
+    main()
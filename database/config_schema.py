@@ -0,0 +1,147 @@
+# database/config_schema.py
+
+import ast
+import json
+
+# Known bot_config keys: key -> (type, default)
+CONFIG_SCHEMA = {
+    "counting_channel_id": (int, None),
+    "counting_paused": (bool, False),
+    "allow_chat_between_counts": (bool, False),
+    "current_count": (int, 0),
+    "last_counter_id": (int, None),
+    "welcome_channel_id": (int, None),
+    "welcome_enabled": (bool, False),
+    "welcome_card_enabled": (bool, False),  # image card for single welcomes (needs Pillow)
+    "welcome_coalesce_seconds": (int, 5),  # joins this close to the last welcome share one message; 0 = never
+    "voice_entry_channel_id": (int, None),
+    "voice_log_channel_id": (int, None),
+    "voice_pool_size": (int, 0),  # idle pre-created temp VCs kept per category; 0 turns the pool off
+    "reddit_channel_id": (int, None),
+    "reddit_enabled": (bool, False),
+    "reddit_min_upvotes": (int, 20),
+    "dune_news_channel_id": (int, None),
+    "dune_news_post_interval": (int, 5),  # seconds between backlog posts in one channel
+    "rss_feeds": (list, None),  # [{"url": ..., "channel_id": ...}]
+    "reddit_subreddits": (dict, None),  # {"name": {"channel_id": ..., "min_upvotes": ...}}
+}
+
+TRUE_WORDS = {"true", "1", "yes", "on", "enabled"}
+FALSE_WORDS = {"false", "0", "no", "off", "disabled"}
+NONE_WORDS = {"none", "null", ""}
+
+# Stored as (type tag, text). Decoding a row is a single dict lookup + call.
+_DECODERS = {
+    "none": lambda text: None,
+    "bool": "1".__eq__,
+    "int": int,
+    "float": float,
+    "str": str,
+    "json": json.loads,
+}
+
+
+def _is_id(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def is_feed_entry(entry) -> bool:
+    """One rss_feeds item: {"url": "http(s)://...", "channel_id": int}."""
+    return isinstance(entry, dict) and isinstance(entry.get("url"), str) \
+        and entry["url"].startswith(("https://", "http://")) and _is_id(entry.get("channel_id"))
+
+
+def is_subreddit_route(route) -> bool:
+    """One reddit_subreddits value: {"channel_id": int, "min_upvotes": int or null}."""
+    min_upvotes = route.get("min_upvotes") if isinstance(route, dict) else None
+    return isinstance(route, dict) and _is_id(route.get("channel_id")) \
+        and (min_upvotes is None or (isinstance(min_upvotes, int) and not isinstance(min_upvotes, bool) and min_upvotes >= 0))
+
+
+# JSON keys whose items (list) or values (dict) must each pass a check: key -> (check, hint)
+ENTRY_CHECKS = {
+    "rss_feeds": (is_feed_entry, '{"url": "https://...", "channel_id": 123}'),
+    "reddit_subreddits": (is_subreddit_route, '"name": {"channel_id": 123, "min_upvotes": 20}'),
+}
+
+
+def valid_entries(key: str, value) -> list:
+    """The well-formed items of a list setting, or the (name, value) pairs of a dict setting."""
+    check = ENTRY_CHECKS[key][0]
+    if isinstance(value, list):
+        return [entry for entry in value if check(entry)]
+    if isinstance(value, dict):
+        return [(name, entry) for name, entry in value.items() if check(entry)]
+    return []
+
+
+def default_for(key: str):
+    return CONFIG_SCHEMA.get(key, (None, None))[1]
+
+
+def encode_value(value) -> tuple[str, str]:
+    if value is None:
+        return "none", ""
+    if isinstance(value, bool):
+        return "bool", "1" if value else "0"
+    if isinstance(value, int):
+        return "int", str(value)
+    if isinstance(value, float):
+        return "float", repr(value)
+    if isinstance(value, str):
+        return "str", value
+    if isinstance(value, (list, tuple, dict)):
+        return "json", json.dumps(value, separators=(",", ":"))
+    raise TypeError(f"Unsupported config value type: {type(value).__name__}")
+
+
+def decode_value(tag: str, text: str):
+    return _DECODERS[tag](text)
+
+
+def decode_legacy(text: str):
+    """Decode a pre-codec repr() row without running eval."""
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return text
+
+
+def parse_config_value(key: str, raw: str):
+    """Turn user input from /set_config into a typed value, raising ValueError if it doesn't fit."""
+    raw = raw.strip()
+    expected = CONFIG_SCHEMA.get(key, (None, None))[0]
+
+    if raw.lower() in NONE_WORDS:
+        return None
+    if expected is bool:
+        if raw.lower() in TRUE_WORDS:
+            return True
+        if raw.lower() in FALSE_WORDS:
+            return False
+        raise ValueError(f"`{key}` expects true or false.")
+    if expected is int:
+        try:
+            return int(raw.strip("<#@!&>"))
+        except ValueError:
+            raise ValueError(f"`{key}` expects a whole number.")
+    if expected in (list, dict):
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            raise ValueError(f"`{key}` expects JSON.")
+        if not isinstance(value, expected):
+            raise ValueError(f"`{key}` expects a JSON {'array' if expected is list else 'object'}.")
+        if key in ENTRY_CHECKS and len(valid_entries(key, value)) != len(value):
+            raise ValueError(f"Every `{key}` entry must look like `{ENTRY_CHECKS[key][1]}`.")
+        return value
+    if expected is not None:
+        return expected(raw)
+
+    # Unknown key: accept plain literals, otherwise keep the text as-is.
+    value = decode_legacy(raw)
+    try:
+        encode_value(value)
+    except TypeError:
+        return raw
+    return value
@@ -2,43 +2,140 @@
 
 import sqlite3
 
+from database.config_schema import decode_legacy, decode_value, default_for, encode_value
+from database.engine import execute
+
 DB_PATH = "settings.db"
 
-def init_config_db():
+# Process-wide copy of guild_config: {guild_id: {key: value}}. Loaded once at
+# startup, then every read is served from memory and every write goes through
+# to SQLite.
+_cache = {}
+_cache_loaded = False
+_cache_stats = {"hits": 0, "misses": 0, "db_reads": 0, "db_writes": 0}
+
+
+def init_config_db(home_guild_id: int = None):
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
     c.execute('''
         CREATE TABLE IF NOT EXISTS bot_config (
             key TEXT PRIMARY KEY,
-            value TEXT
+            value TEXT,
+            type TEXT
+        )
+    ''')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS guild_config (
+            guild_id INTEGER NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT,
+            type TEXT,
+            PRIMARY KEY (guild_id, key)
         )
     ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_guild_config_key ON guild_config (key)')
+    migrate_legacy_values(conn)
+    migrate_to_guild(conn, home_guild_id)
     conn.commit()
     conn.close()
 
-def set_config(key: str, value):
-    conn = sqlite3.connect(DB_PATH)
+
+def migrate_legacy_values(conn):
+    """One-shot rewrite of repr()-encoded rows into (type, value) pairs."""
     c = conn.cursor()
-    c.execute('''
-        INSERT INTO bot_config (key, value)
-        VALUES (?, ?)
-        ON CONFLICT(key) DO UPDATE SET value = excluded.value
-    ''', (key, repr(value)))
-    conn.commit()
-    conn.close()
+    columns = [row[1] for row in c.execute('PRAGMA table_info(bot_config)')]
+    if "type" not in columns:
+        c.execute('ALTER TABLE bot_config ADD COLUMN type TEXT')
 
-def get_config(key: str):
-    conn = sqlite3.connect(DB_PATH)
+    rows = c.execute('SELECT key, value FROM bot_config WHERE type IS NULL').fetchall()
+    for key, value in rows:
+        tag, text = encode_value(decode_legacy(value))
+        c.execute('UPDATE bot_config SET value = ?, type = ? WHERE key = ?', (text, tag, key))
+    if rows:
+        print(f"[Config] Migrated {len(rows)} legacy config value(s).")
+
+
+def migrate_to_guild(conn, home_guild_id: int = None):
+    """Move the old global bot_config rows into guild_config under the home guild."""
     c = conn.cursor()
-    c.execute('SELECT value FROM bot_config WHERE key = ?', (key,))
-    result = c.fetchone()
-    conn.close()
-    return eval(result[0]) if result else None
+    count = c.execute('SELECT COUNT(*) FROM bot_config').fetchone()[0]
+    if not count:
+        return
+    if home_guild_id is None:
+        print(f"[Config] {count} un-scoped config value(s) left in bot_config: set GUILD_ID to migrate them.")
+        return
 
-def get_all_config() -> dict:
+    c.execute('''
+        INSERT OR IGNORE INTO guild_config (guild_id, key, value, type)
+        SELECT ?, key, value, type FROM bot_config
+    ''', (home_guild_id,))
+    c.execute('DELETE FROM bot_config')
+    print(f"[Config] Moved {count} config value(s) to guild {home_guild_id}.")
+
+
+def load_config_cache():
+    """Load the whole guild_config table into memory (startup only, blocking)."""
+    global _cache_loaded
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
-    c.execute('SELECT key, value FROM bot_config')
+    c.execute('SELECT guild_id, key, type, value FROM guild_config')
     rows = c.fetchall()
     conn.close()
-    return {key: eval(value) for key, value in rows}
+    _cache_stats["db_reads"] += 1
+    _cache.clear()
+    for guild_id, key, tag, value in rows:
+        _cache.setdefault(guild_id, {})[key] = decode_value(tag, value)
+    _cache_loaded = True
+
+
+def get_cache_stats() -> dict:
+    stats = dict(_cache_stats)
+    reads = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = stats["hits"] / reads if reads else 0.0
+    stats["round_trips_saved"] = stats["hits"]
+    stats["cached_keys"] = sum(len(keys) for keys in _cache.values())
+    stats["cached_guilds"] = len(_cache)
+    return stats
+
+
+async def set_config(guild_id: int, key: str, value):
+    tag, text = encode_value(value)
+    await execute(DB_PATH, '''
+        INSERT INTO guild_config (guild_id, key, value, type)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(guild_id, key) DO UPDATE SET value = excluded.value, type = excluded.type
+    ''', (guild_id, key, text, tag))
+    _cache_stats["db_writes"] += 1
+    _cache.setdefault(guild_id, {})[key] = value
+
+
+def _ensure_loaded():
+    if _cache_loaded:
+        _cache_stats["hits"] += 1
+    else:
+        _cache_stats["misses"] += 1
+        load_config_cache()
+
+
+def get_config(guild_id: int, key: str):
+    _ensure_loaded()
+    guild_config = _cache.get(guild_id)
+    if guild_config is None or key not in guild_config:
+        return default_for(key)
+    return guild_config[key]
+
+
+def get_all_config(guild_id: int) -> dict:
+    _ensure_loaded()
+    return dict(_cache.get(guild_id, {}))
+
+
+def get_guilds_with(key: str) -> dict:
+    """Every guild that has `key` set to something truthy: {guild_id: value}."""
+    _ensure_loaded()
+    return {
+        guild_id: guild_config[key]
+        for guild_id, guild_config in _cache.items()
+        if guild_config.get(key)
+    }
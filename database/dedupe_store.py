@@ -0,0 +1,153 @@
+# database/dedupe_store.py
+
+import sqlite3
+import time
+from collections import OrderedDict
+
+from database.engine import execute, fetchone, fetchall, transaction
+
+DB_PATH = "settings.db"
+
+RECENT_WINDOW_SECONDS = 7 * 24 * 3600   # what gets pre-loaded into memory at startup
+RETENTION_SECONDS = 30 * 24 * 3600      # rows not seen again for this long are pruned
+SEEN_REFRESH_SECONDS = 24 * 3600        # seen_at is bumped at most this often, well inside the recent window
+DEFAULT_LRU_SIZE = 2000
+
+
+def init_dedupe_db():
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS seen_items (
+            source TEXT NOT NULL,
+            item_id TEXT NOT NULL,
+            seen_at INTEGER NOT NULL,
+            PRIMARY KEY (source, item_id)
+        )
+    ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_seen_items_seen_at ON seen_items (seen_at)')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS feed_cursors (
+            source TEXT PRIMARY KEY,
+            cursor TEXT,
+            updated_at INTEGER NOT NULL
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+
+class DedupeIndex:
+    """Durable "already posted?" set for one source, read through a bounded LRU."""
+
+    def __init__(self, source: str, max_size: int = DEFAULT_LRU_SIZE):
+        self.source = source
+        self.max_size = max_size
+        self._recent = OrderedDict()
+
+    def _remember(self, item_id: str):
+        self._recent[item_id] = True
+        self._recent.move_to_end(item_id)
+        while len(self._recent) > self.max_size:
+            self._recent.popitem(last=False)
+
+    async def load_recent(self, window: int = RECENT_WINDOW_SECONDS):
+        rows = await fetchall(DB_PATH, '''
+            SELECT item_id FROM seen_items
+            WHERE source = ? AND seen_at >= ?
+            ORDER BY seen_at DESC, rowid DESC
+            LIMIT ?
+        ''', (self.source, int(time.time()) - window, self.max_size))
+        # Oldest first, so the newest ids end up at the fresh end of the LRU.
+        for (item_id,) in reversed(rows):
+            self._remember(item_id)
+
+    async def seen_many(self, item_ids: list[str]) -> set:
+        """The subset of `item_ids` already seen; everything missing from the LRU is one query.
+
+        Ids that are still being served get their seen_at bumped, so retention
+        counts from the last time a feed listed them, not the first.
+        """
+        found = {item_id for item_id in item_ids if item_id in self._recent}
+        missing = [item_id for item_id in item_ids if item_id not in found]
+        if missing:
+            placeholders = ", ".join("?" for _ in missing)
+            rows = await fetchall(
+                DB_PATH,
+                f'SELECT item_id FROM seen_items WHERE source = ? AND item_id IN ({placeholders})',
+                (self.source, *missing)
+            )
+            found.update(row[0] for row in rows)
+        for item_id in found:
+            self._remember(item_id)
+
+        if found:
+            now = int(time.time())
+            placeholders = ", ".join("?" for _ in found)
+            await execute(
+                DB_PATH,
+                f'UPDATE seen_items SET seen_at = ? WHERE source = ? AND seen_at < ? AND item_id IN ({placeholders})',
+                (now, self.source, now - SEEN_REFRESH_SECONDS, *found)
+            )
+        return found
+
+    async def has_history(self) -> bool:
+        if self._recent:
+            return True
+        return await fetchone(DB_PATH, 'SELECT 1 FROM seen_items WHERE source = ? LIMIT 1', (self.source,)) is not None
+
+    async def mark_many(self, item_ids: list[str]):
+        """Record a whole batch in one transaction."""
+        now = int(time.time())
+        for item_id in item_ids:
+            self._remember(item_id)
+        async with transaction(DB_PATH) as conn:
+            await conn.executemany('''
+                INSERT OR IGNORE INTO seen_items (source, item_id, seen_at)
+                VALUES (?, ?, ?)
+            ''', [(self.source, item_id, now) for item_id in item_ids])
+
+
+def import_seen_items(source: str, rows: list[tuple[str, int]]):
+    """Copy (item_id, seen_at) rows from an older per-cog table (startup only, blocking)."""
+    conn = sqlite3.connect(DB_PATH)
+    conn.executemany(
+        'INSERT OR IGNORE INTO seen_items (source, item_id, seen_at) VALUES (?, ?, ?)',
+        [(source, item_id, seen_at) for item_id, seen_at in rows]
+    )
+    conn.commit()
+    conn.close()
+
+
+def scope_seen_items(source: str, scope: str):
+    """Suffix every un-scoped id of `source` with "@scope" (startup only, blocking)."""
+    conn = sqlite3.connect(DB_PATH)
+    count = conn.execute(
+        "UPDATE OR IGNORE seen_items SET item_id = item_id || '@' || ? WHERE source = ? AND item_id NOT LIKE '%@%'",
+        (scope, source)
+    ).rowcount
+    conn.commit()
+    conn.close()
+    if count:
+        print(f"[Dedupe] Scoped {count} {source} id(s) to {scope}.")
+
+
+async def prune_seen(max_age: int = RETENTION_SECONDS, source: str = None):
+    cutoff = int(time.time()) - max_age
+    if source is None:
+        await execute(DB_PATH, 'DELETE FROM seen_items WHERE seen_at < ?', (cutoff,))
+    else:
+        await execute(DB_PATH, 'DELETE FROM seen_items WHERE source = ? AND seen_at < ?', (source, cutoff))
+
+
+async def get_cursor(source: str):
+    row = await fetchone(DB_PATH, 'SELECT cursor FROM feed_cursors WHERE source = ?', (source,))
+    return row[0] if row else None
+
+
+async def set_cursor(source: str, cursor: str):
+    await execute(DB_PATH, '''
+        INSERT INTO feed_cursors (source, cursor, updated_at)
+        VALUES (?, ?, ?)
+        ON CONFLICT(source) DO UPDATE SET cursor = excluded.cursor, updated_at = excluded.updated_at
+    ''', (source, cursor, int(time.time())))
@@ -0,0 +1,75 @@
+# database/engine.py
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import aiosqlite
+
+# One long-lived connection per database file. aiosqlite runs every connection
+# on its own worker thread, so queries and fsyncs happen off the event loop.
+_connections = {}
+_locks = {}
+_open_lock = asyncio.Lock()
+
+
+async def get_connection(path: str) -> aiosqlite.Connection:
+    conn = _connections.get(path)
+    if conn is not None:
+        return conn
+
+    async with _open_lock:
+        conn = _connections.get(path)
+        if conn is None:
+            conn = await aiosqlite.connect(path)
+            await conn.execute("PRAGMA journal_mode=WAL")
+            await conn.execute("PRAGMA synchronous=NORMAL")
+            _connections[path] = conn
+            _locks[path] = asyncio.Lock()
+    return conn
+
+
+@asynccontextmanager
+async def transaction(path: str):
+    """Run several statements on the shared connection and commit them together."""
+    conn = await get_connection(path)
+    async with _locks[path]:
+        try:
+            yield conn
+            await conn.commit()
+        except Exception:
+            await conn.rollback()
+            raise
+
+
+async def execute(path: str, sql: str, params=()):
+    async with transaction(path) as conn:
+        await conn.execute(sql, params)
+
+
+async def executemany(path: str, sql: str, rows):
+    async with transaction(path) as conn:
+        await conn.executemany(sql, rows)
+
+
+async def fetchone(path: str, sql: str, params=()):
+    conn = await get_connection(path)
+    async with _locks[path]:
+        async with conn.execute(sql, params) as cursor:
+            return await cursor.fetchone()
+
+
+async def fetchall(path: str, sql: str, params=()):
+    conn = await get_connection(path)
+    async with _locks[path]:
+        async with conn.execute(sql, params) as cursor:
+            return await cursor.fetchall()
+
+
+async def close_all():
+    for path, conn in list(_connections.items()):
+        try:
+            await conn.close()
+        except Exception as e:
+            print(f"[Storage] Failed to close {path}: {e}")
+    _connections.clear()
+    _locks.clear()
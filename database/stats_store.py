@@ -1,10 +1,50 @@
 # database/stats_store.py
 
 import sqlite3
+from bisect import bisect_left, insort
+
+from database.engine import execute, fetchone, fetchall, transaction
 
 DB_PATH = "settings.db"
 
-def init_stats_db():
+# Write-behind buffer: (user_id, stat) -> delta not yet written to SQLite.
+# _flushing holds the batch currently being committed so reads stay exact.
+_pending = {}
+_flushing = {}
+
+# stat -> Leaderboard, holding every user's exact total (pending deltas included)
+_leaderboards = {}
+_leaderboards_loaded = False
+
+
+class Leaderboard:
+    """All users' values for one stat, kept sorted so rank lookups are a bisect."""
+
+    def __init__(self):
+        self.values = {}   # {user_id: value}
+        self.ranking = []  # sorted [(-value, user_id)]
+
+    def __len__(self):
+        return len(self.ranking)
+
+    def update(self, user_id: int, value: int):
+        old = self.values.get(user_id)
+        if old is not None:
+            del self.ranking[bisect_left(self.ranking, (-old, user_id))]
+        self.values[user_id] = value
+        insort(self.ranking, (-value, user_id))
+
+    def rank(self, user_id: int):
+        """1-based rank; users with the same value share a rank. None if unranked."""
+        value = self.values.get(user_id)
+        if value is None:
+            return None
+        return bisect_left(self.ranking, (-value,)) + 1
+
+    def page(self, offset: int = 0, limit: int = 10) -> list[tuple[int, int]]:
+        return [(user_id, -neg_value) for neg_value, user_id in self.ranking[offset:offset + limit]]
+
+def init_stats_db(home_guild_id: int = None):
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
     c.execute('''
@@ -15,66 +55,123 @@ def init_stats_db():
             PRIMARY KEY (user_id, stat)
         )
     ''')
+    c.execute('CREATE INDEX IF NOT EXISTS idx_user_stats_stat_value ON user_stats (stat, value DESC)')
     c.execute('''
         CREATE TABLE IF NOT EXISTS global_stats (
             key TEXT PRIMARY KEY,
             value INTEGER
         )
     ''')
+    migrate_guild_stats(conn, home_guild_id)
     conn.commit()
     conn.close()
 
-def set_user_stat(user_id: int, stat: str, value: int):
+# Per-guild stats are stored as "<stat>:<guild_id>"; these were global before.
+GUILD_SCOPED_STATS = ("counting_score",)
+
+def migrate_guild_stats(conn, home_guild_id: int = None):
+    """Move un-scoped per-guild stats under the home guild."""
+    c = conn.cursor()
+    for stat in GUILD_SCOPED_STATS:
+        count = c.execute('SELECT COUNT(*) FROM user_stats WHERE stat = ?', (stat,)).fetchone()[0]
+        if not count:
+            continue
+        if home_guild_id is None:
+            print(f"[Stats] {count} un-scoped {stat} row(s) left: set GUILD_ID to migrate them.")
+            continue
+        c.execute('UPDATE OR IGNORE user_stats SET stat = ? WHERE stat = ?', (f"{stat}:{home_guild_id}", stat))
+        print(f"[Stats] Moved {count} {stat} row(s) to guild {home_guild_id}.")
+
+def load_leaderboards():
+    """Build the in-memory leaderboards from user_stats (startup only, blocking)."""
+    global _leaderboards_loaded
     conn = sqlite3.connect(DB_PATH)
     c = conn.cursor()
-    c.execute('''
+    c.execute('SELECT user_id, stat, value FROM user_stats')
+    rows = c.fetchall()
+    conn.close()
+    totals = {}
+    for user_id, stat, value in rows:
+        totals[(user_id, stat)] = value
+    for source in (_flushing, _pending):
+        for key, delta in source.items():
+            totals[key] = totals.get(key, 0) + delta
+
+    _leaderboards.clear()
+    for (user_id, stat), value in totals.items():
+        board = _leaderboards.setdefault(stat, Leaderboard())
+        board.values[user_id] = value
+        board.ranking.append((-value, user_id))
+    for board in _leaderboards.values():
+        board.ranking.sort()
+    _leaderboards_loaded = True
+
+def get_leaderboard(stat: str) -> Leaderboard:
+    if not _leaderboards_loaded:
+        load_leaderboards()
+    return _leaderboards.setdefault(stat, Leaderboard())
+
+async def set_user_stat(user_id: int, stat: str, value: int):
+    _pending.pop((user_id, stat), None)
+    get_leaderboard(stat).update(user_id, value)
+    await execute(DB_PATH, '''
         INSERT INTO user_stats (user_id, stat, value)
         VALUES (?, ?, ?)
         ON CONFLICT(user_id, stat) DO UPDATE SET value = excluded.value
     ''', (user_id, stat, value))
-    conn.commit()
-    conn.close()
 
-def get_user_stat(user_id: int, stat: str) -> int:
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('SELECT value FROM user_stats WHERE user_id = ? AND stat = ?', (user_id, stat))
-    row = c.fetchone()
-    conn.close()
-    return row[0] if row else 0
+async def get_user_stat(user_id: int, stat: str) -> int:
+    key = (user_id, stat)
+    row = await fetchone(DB_PATH, 'SELECT value FROM user_stats WHERE user_id = ? AND stat = ?', (user_id, stat))
+    return (row[0] if row else 0) + _flushing.get(key, 0) + _pending.get(key, 0)
 
 def increment_user_stat(user_id: int, stat: str, amount: int = 1):
-    current = get_user_stat(user_id, stat)
-    set_user_stat(user_id, stat, current + amount)
+    """Queue an increment; it reaches SQLite on the next flush_user_stats()."""
+    board = get_leaderboard(stat)
+    board.update(user_id, board.values.get(user_id, 0) + amount)
+    key = (user_id, stat)
+    _pending[key] = _pending.get(key, 0) + amount
 
-def get_top_users(stat: str, limit: int = 10):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
+async def flush_user_stats() -> int:
+    """Write every pending increment in one transaction. Returns the number of rows touched."""
+    if not _pending or _flushing:
+        return 0
+
+    _flushing.update(_pending)
+    _pending.clear()
+    rows = [(user_id, stat, delta) for (user_id, stat), delta in _flushing.items()]
+    try:
+        async with transaction(DB_PATH) as conn:
+            await conn.executemany('''
+                INSERT INTO user_stats (user_id, stat, value)
+                VALUES (?, ?, ?)
+                ON CONFLICT(user_id, stat) DO UPDATE SET value = value + excluded.value
+            ''', rows)
+    except Exception:
+        # Keep the deltas so the next flush retries them.
+        for key, delta in _flushing.items():
+            _pending[key] = _pending.get(key, 0) + delta
+        raise
+    finally:
+        _flushing.clear()
+    return len(rows)
+
+async def get_top_users(stat: str, limit: int = 10):
+    await flush_user_stats()
+    return await fetchall(DB_PATH, '''
         SELECT user_id, value FROM user_stats
         WHERE stat = ?
         ORDER BY value DESC
         LIMIT ?
     ''', (stat, limit))
-    results = c.fetchall()
-    conn.close()
-    return results
 
-def set_global_stat(key: str, value: int):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
+async def set_global_stat(key: str, value: int):
+    await execute(DB_PATH, '''
         INSERT INTO global_stats (key, value)
         VALUES (?, ?)
         ON CONFLICT(key) DO UPDATE SET value = excluded.value
     ''', (key, value))
-    conn.commit()
-    conn.close()
 
-def get_global_stat(key: str) -> int:
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('SELECT value FROM global_stats WHERE key = ?', (key,))
-    row = c.fetchone()
-    conn.close()
+async def get_global_stat(key: str) -> int:
+    row = await fetchone(DB_PATH, 'SELECT value FROM global_stats WHERE key = ?', (key,))
     return row[0] if row else 0
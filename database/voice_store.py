@@ -0,0 +1,114 @@
+# database/voice_store.py
+
+import sqlite3
+import time
+from collections import OrderedDict
+
+from database.engine import execute, fetchall
+
+DB_PATH = "settings.db"
+
+
+def init_voice_db():
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS temp_voice_channels (
+            channel_id INTEGER PRIMARY KEY,
+            guild_id INTEGER NOT NULL,
+            owner_id INTEGER NOT NULL,
+            created_at INTEGER NOT NULL
+        )
+    ''')
+    c.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_temp_voice_owner ON temp_voice_channels (guild_id, owner_id)')
+    c.execute('''
+        CREATE TABLE IF NOT EXISTS voice_pool (
+            channel_id INTEGER PRIMARY KEY,
+            guild_id INTEGER NOT NULL,
+            category_id INTEGER,
+            pooled_at INTEGER NOT NULL
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+
+class TempChannelRegistry:
+    """Which voice channels the bot created and for whom. Memory for lookups, SQLite so it survives restarts."""
+
+    def __init__(self):
+        self.channels = {}  # {channel_id: (guild_id, owner_id)}
+        self.owners = {}    # {(guild_id, owner_id): channel_id}
+        self.pools = {}     # {(guild_id, category_id): OrderedDict{channel_id: None}}, longest idle first
+        self.idle = {}      # {channel_id: (guild_id, category_id)}
+
+    async def load(self):
+        rows = await fetchall(DB_PATH, 'SELECT channel_id, guild_id, owner_id FROM temp_voice_channels')
+        self.channels.clear()
+        self.owners.clear()
+        for channel_id, guild_id, owner_id in rows:
+            self.channels[channel_id] = (guild_id, owner_id)
+            self.owners[(guild_id, owner_id)] = channel_id
+
+        rows = await fetchall(DB_PATH, 'SELECT channel_id, guild_id, category_id FROM voice_pool ORDER BY pooled_at, rowid')
+        self.pools.clear()
+        self.idle.clear()
+        for channel_id, guild_id, category_id in rows:
+            self.pools.setdefault((guild_id, category_id), OrderedDict())[channel_id] = None
+            self.idle[channel_id] = (guild_id, category_id)
+
+    def __contains__(self, channel_id: int) -> bool:
+        return channel_id in self.channels
+
+    def owned_by(self, guild_id: int, owner_id: int):
+        return self.owners.get((guild_id, owner_id))
+
+    async def add(self, channel_id: int, guild_id: int, owner_id: int):
+        old = self.owners.get((guild_id, owner_id))
+        if old is not None:
+            self.channels.pop(old, None)
+        self.channels[channel_id] = (guild_id, owner_id)
+        self.owners[(guild_id, owner_id)] = channel_id
+        await execute(DB_PATH, '''
+            INSERT OR REPLACE INTO temp_voice_channels (channel_id, guild_id, owner_id, created_at)
+            VALUES (?, ?, ?, ?)
+        ''', (channel_id, guild_id, owner_id, int(time.time())))
+
+    async def remove(self, channel_id: int):
+        if channel_id in self.idle:
+            await self._remove_idle(channel_id)
+        entry = self.channels.pop(channel_id, None)
+        if entry is None:
+            return
+        if self.owners.get(entry) == channel_id:
+            del self.owners[entry]
+        await execute(DB_PATH, 'DELETE FROM temp_voice_channels WHERE channel_id = ?', (channel_id,))
+
+    # ─── Idle pool ───────────────────────────────────
+
+    def idle_count(self, guild_id: int, category_id: int) -> int:
+        return len(self.pools.get((guild_id, category_id), ()))
+
+    async def add_idle(self, channel_id: int, guild_id: int, category_id: int):
+        self.pools.setdefault((guild_id, category_id), OrderedDict())[channel_id] = None
+        self.idle[channel_id] = (guild_id, category_id)
+        await execute(DB_PATH, '''
+            INSERT OR REPLACE INTO voice_pool (channel_id, guild_id, category_id, pooled_at)
+            VALUES (?, ?, ?, ?)
+        ''', (channel_id, guild_id, category_id, int(time.time())))
+
+    async def take_idle(self, guild_id: int, category_id: int):
+        """The channel that has been idle longest, or None. Spreads renames across the pool."""
+        pool = self.pools.get((guild_id, category_id))
+        if not pool:
+            return None
+        channel_id = next(iter(pool))
+        await self._remove_idle(channel_id)
+        return channel_id
+
+    async def _remove_idle(self, channel_id: int):
+        key = self.idle.pop(channel_id)
+        self.pools[key].pop(channel_id, None)
+        if not self.pools[key]:
+            del self.pools[key]
+        await execute(DB_PATH, 'DELETE FROM voice_pool WHERE channel_id = ?', (channel_id,))
@@ -0,0 +1,211 @@
+# feeds/engine.py
+
+import asyncio
+import time
+
+import discord
+from discord.ext import tasks
+
+from database.dedupe_store import DedupeIndex, prune_seen, RETENTION_SECONDS
+from feeds.http import create_session, init_http_cache, shutdown_parser_pool
+
+TICK_SECONDS = 5            # scheduler resolution; sources poll on their own intervals
+MAX_CONCURRENT_POLLS = 4    # sources fetching at the same time, across the whole bot
+
+_engine = None
+
+
+class FeedItem:
+    """One postable entry: a stable id for dedupe plus whatever its source needs to render it."""
+
+    __slots__ = ("item_id", "data", "published", "route")
+
+    def __init__(self, item_id: str, data, published: float = None, route: str = None):
+        self.item_id = item_id
+        self.data = data
+        self.published = published  # unix time, used to post oldest first
+        self.route = route          # optional routing key, e.g. the subreddit
+
+
+class FeedSource:
+    """Base adapter. Subclasses fetch in poll(), pick channels in targets() and build messages in render()."""
+
+    interval = 600          # seconds between polls; a source may change it after each poll
+    concurrency = 1         # requests a single poll may have in flight
+    retention = RETENTION_SECONDS  # dedupe rows older than this are pruned; None keeps them
+    first_poll_limit = None  # with no dedupe history yet, only post this many of the newest items
+
+    def __init__(self, name: str):
+        self.name = name
+        self.next_run = 0.0
+
+    async def start(self, session):
+        pass
+
+    async def close(self):
+        pass
+
+    async def poll(self, session) -> list[FeedItem]:
+        raise NotImplementedError
+
+    def targets(self, item: FeedItem) -> list[int]:
+        """Channel ids `item` should be posted to."""
+        raise NotImplementedError
+
+    def render(self, item: FeedItem):
+        """(embed, view) for one send, or None to skip the item."""
+        raise NotImplementedError
+
+    def post_interval(self, channel) -> float:
+        """Seconds between two posts of this source in `channel`."""
+        return 0
+
+
+class FeedEngine:
+    """Polls every registered source from one timer over one HTTP session."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.session = None
+        self.sources = {}   # {name: FeedSource}
+        self.indexes = {}   # {name: DedupeIndex}
+        self.running = {}   # {name: asyncio.Task} for polls in flight
+        self.poll_budget = asyncio.Semaphore(MAX_CONCURRENT_POLLS)
+
+    async def register(self, source: FeedSource):
+        if source.name in self.sources:
+            await self.unregister(source.name)
+        if self.session is None:
+            self.session = create_session()
+
+        index = DedupeIndex(source.name)
+        await index.load_recent()
+        await source.start(self.session)
+        self.indexes[source.name] = index
+        self.sources[source.name] = source
+
+        if not self.tick.is_running():
+            self.tick.start()
+            self.prune.start()
+
+    async def unregister(self, name: str):
+        source = self.sources.pop(name, None)
+        self.indexes.pop(name, None)
+        task = self.running.pop(name, None)
+        if task is not None:
+            task.cancel()
+        if source is not None:
+            await source.close()
+
+        if not self.sources:
+            self.tick.cancel()
+            self.prune.cancel()
+            if self.session is not None:
+                await self.session.close()
+                self.session = None
+            shutdown_parser_pool()
+
+    def poll_soon(self, name: str):
+        source = self.sources.get(name)
+        if source is not None:
+            source.next_run = 0.0
+
+    @tasks.loop(seconds=TICK_SECONDS)
+    async def tick(self):
+        now = time.monotonic()
+        for name, source in list(self.sources.items()):
+            if name in self.running or now < source.next_run:
+                continue
+            self.running[name] = asyncio.create_task(self.run(source))
+
+    @tick.before_loop
+    async def before_tick(self):
+        await self.bot.wait_until_ready()
+
+    @tasks.loop(hours=12)
+    async def prune(self):
+        for source in list(self.sources.values()):
+            if source.retention is None:
+                continue
+            try:
+                await prune_seen(source.retention, source.name)
+            except Exception as e:
+                print(f"[Feeds] Failed to prune {source.name}: {e}")
+
+    async def run(self, source: FeedSource):
+        try:
+            async with self.poll_budget:
+                items = await source.poll(self.session)
+            await self.dispatch(source, items)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Feeds] {source.name} failed: {e}")
+        finally:
+            source.next_run = time.monotonic() + source.interval
+            if self.running.get(source.name) is asyncio.current_task():
+                del self.running[source.name]
+
+    async def dispatch(self, source: FeedSource, items: list[FeedItem]):
+        """Post the unseen items oldest first, route by route, then mark them all at once."""
+        index = self.indexes.get(source.name)
+        if index is None or not items:
+            return
+
+        seen = await index.seen_many([item.item_id for item in items])
+        fresh = {}
+        for item in items:
+            if item.item_id not in seen:
+                fresh.setdefault(item.item_id, item)
+        if not fresh:
+            return
+
+        # Undated items keep their poll order, after the dated ones.
+        fresh = sorted(fresh.values(), key=lambda item: item.published if item.published is not None else float("inf"))
+        to_post = fresh
+        if source.first_poll_limit is not None and not await index.has_history():
+            to_post = fresh[-source.first_poll_limit:]
+
+        routes = {}
+        for item in to_post:
+            for channel_id in source.targets(item):
+                routes.setdefault(channel_id, []).append(item)
+        channels = {
+            channel: routed
+            for channel, routed in ((self.bot.get_channel(cid), routed) for cid, routed in routes.items())
+            if isinstance(channel, discord.TextChannel)
+        }
+        if not channels:
+            # Nowhere to post yet: leave them unseen so they go out once a channel is set.
+            return
+
+        await asyncio.gather(*(self.send_all(source, channel, routed) for channel, routed in channels.items()))
+        await index.mark_many([item.item_id for item in fresh])
+
+    async def send_all(self, source: FeedSource, channel: discord.TextChannel, items: list[FeedItem]):
+        interval = source.post_interval(channel)
+        sent = 0
+        for item in items:
+            message = source.render(item)
+            if message is None:
+                continue
+            if sent and interval:
+                await asyncio.sleep(interval)
+            embed, view = message
+            try:
+                if view is None:
+                    await channel.send(embed=embed)
+                else:
+                    await channel.send(embed=embed, view=view)
+            except Exception as e:
+                print(f"[Feeds] {source.name}: failed to post {item.item_id} to {channel.id}: {e}")
+            sent += 1
+
+
+def get_feed_engine(bot) -> FeedEngine:
+    """The process-wide engine; created by whichever cog registers a source first."""
+    global _engine
+    if _engine is None:
+        init_http_cache()
+        _engine = FeedEngine(bot)
+    return _engine
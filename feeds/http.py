@@ -0,0 +1,156 @@
+# feeds/http.py
+
+import asyncio
+import codecs
+import hashlib
+import json
+import multiprocessing
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+
+import aiohttp
+
+from database.engine import execute, fetchone
+
+DB_PATH = "feeds.sqlite3"
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/113.0 Safari/537.36"
+    )
+}
+HTTP_POOL_SIZE = 16         # connections shared by every feed source
+DNS_CACHE_SECONDS = 300
+KEEPALIVE_SECONDS = 60
+REQUEST_TIMEOUT_SECONDS = 10
+MAX_BODY_BYTES = 2 * 1024 * 1024  # pages bigger than this are abandoned
+CHUNK_SIZE = 16 * 1024
+PARSER_WORKERS = 2          # processes running parsers off the event loop
+
+_parser_pool = None
+
+
+def init_http_cache():
+    conn = sqlite3.connect(DB_PATH)
+    c = conn.cursor()
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS http_cache (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            content_hash TEXT,
+            payload TEXT,
+            fetched_at TIMESTAMP
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+
+def create_session() -> aiohttp.ClientSession:
+    """One pooled session for every source: DNS, TCP and TLS are reused across polls."""
+    connector = aiohttp.TCPConnector(
+        limit=HTTP_POOL_SIZE,
+        ttl_dns_cache=DNS_CACHE_SECONDS,
+        keepalive_timeout=KEEPALIVE_SECONDS
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+def get_parser_pool():
+    global _parser_pool
+    if _parser_pool is None:
+        # spawn: forking a process that already runs threads (aiosqlite, Flask) is unsafe.
+        _parser_pool = ProcessPoolExecutor(
+            max_workers=PARSER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _parser_pool
+
+
+def shutdown_parser_pool():
+    global _parser_pool
+    if _parser_pool is not None:
+        _parser_pool.shutdown(wait=False, cancel_futures=True)
+        _parser_pool = None
+
+
+async def fetch_parsed(session, url, parse=None, timeout=REQUEST_TIMEOUT_SECONDS,
+                       max_bytes=MAX_BODY_BYTES, stream_parser=None):
+    """Conditional, size-capped GET through the http_cache table.
+
+    Returns (payload, changed, error). `parse` only runs when the body really
+    changed: a 304 or a 200 with an identical content hash reuses the stored
+    payload. With a `stream_parser` (feed()/done/result()), chunks are parsed
+    as they arrive and the download stops as soon as it reports done.
+    """
+    cached = await fetchone(
+        DB_PATH, "SELECT etag, last_modified, content_hash, payload FROM http_cache WHERE url = ?", (url,)
+    )
+    headers = dict(HEADERS)
+    if cached:
+        if cached[0]:
+            headers["If-None-Match"] = cached[0]
+        if cached[1]:
+            headers["If-Modified-Since"] = cached[1]
+
+    hasher = hashlib.sha256()
+    chunks = []
+    size = 0
+    try:
+        async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout)) as res:
+            if res.status == 304 and cached:
+                return json.loads(cached[3]), False, None
+            if res.status != 200:
+                return None, False, f"HTTP {res.status} error"
+            if (res.content_length or 0) > max_bytes:
+                return None, False, f"Response larger than {max_bytes} bytes"
+            encoding = res.charset or "utf-8"
+            etag = res.headers.get("ETag")
+            last_modified = res.headers.get("Last-Modified")
+            decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+
+            async for chunk in res.content.iter_chunked(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    return None, False, f"Response larger than {max_bytes} bytes"
+                hasher.update(chunk)
+                if stream_parser is None:
+                    chunks.append(chunk)
+                    continue
+                stream_parser.feed(decoder.decode(chunk))
+                if stream_parser.done:
+                    break
+            else:
+                if stream_parser is not None:
+                    stream_parser.feed(decoder.decode(b"", final=True))
+                    stream_parser.close()
+    except asyncio.TimeoutError:
+        return None, False, f"Timed out after {timeout}s"
+    except Exception as e:
+        return None, False, str(e)
+
+    content_hash = hasher.hexdigest()
+    if stream_parser is not None:
+        # An early stop hashes only a prefix, so compare what was extracted instead.
+        payload = stream_parser.result()
+        changed = not cached or json.loads(cached[3]) != payload
+    elif cached and cached[2] == content_hash:
+        payload, changed = json.loads(cached[3]), False
+    else:
+        html = b"".join(chunks).decode(encoding, errors="replace")
+        payload = await asyncio.get_running_loop().run_in_executor(get_parser_pool(), parse, html)
+        changed = True
+
+    await execute(DB_PATH, """
+        INSERT INTO http_cache (url, etag, last_modified, content_hash, payload, fetched_at)
+        VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT(url) DO UPDATE SET
+            etag = excluded.etag,
+            last_modified = excluded.last_modified,
+            content_hash = excluded.content_hash,
+            payload = excluded.payload,
+            fetched_at = excluded.fetched_at
+    """, (url, etag, last_modified, content_hash, json.dumps(payload)))
+    return payload, changed, None
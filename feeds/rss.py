@@ -0,0 +1,134 @@
+# feeds/rss.py
+
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import discord
+from bs4 import BeautifulSoup
+
+from database.config_schema import valid_entries
+from database.config_store import get_guilds_with
+from feeds.engine import FeedItem, FeedSource
+from feeds.http import fetch_parsed
+
+RSS_POLL_SECONDS = 900
+RSS_FIRST_POLL_LIMIT = 3    # a newly added feed posts its latest few entries, not its whole archive
+SUMMARY_CHARS = 400
+MAX_FEEDS_PER_GUILD = 25
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+MEDIA = "{http://search.yahoo.com/mrss/}"
+
+
+def _text(element, path):
+    found = element.find(path)
+    return (found.text or "").strip() if found is not None and found.text else ""
+
+
+def _timestamp(value, iso=False):
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00")) if iso else parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _plain(html):
+    text = BeautifulSoup(html, "html.parser").get_text(" ", strip=True) if html else ""
+    return text if len(text) <= SUMMARY_CHARS else text[:SUMMARY_CHARS].rsplit(" ", 1)[0] + "…"
+
+
+# Runs in the parser pool: text in, plain data out.
+def parse_feed(xml):
+    """RSS 2.0 or Atom into {"title": ..., "entries": [...]}, entries newest first as published."""
+    root = ET.fromstring(xml)
+    entries = []
+
+    if root.tag == f"{ATOM}feed":
+        feed_title = _text(root, f"{ATOM}title")
+        for entry in root.iter(f"{ATOM}entry"):
+            link = next(
+                (el.get("href") for el in entry.findall(f"{ATOM}link") if el.get("rel", "alternate") == "alternate"),
+                ""
+            )
+            entries.append({
+                "id": _text(entry, f"{ATOM}id") or link,
+                "title": _text(entry, f"{ATOM}title") or "Untitled",
+                "link": link,
+                "summary": _plain(_text(entry, f"{ATOM}summary") or _text(entry, f"{ATOM}content")),
+                "published": _timestamp(_text(entry, f"{ATOM}published") or _text(entry, f"{ATOM}updated"), iso=True),
+                "image": None,
+            })
+    else:
+        channel = root.find("channel")
+        if channel is None:
+            raise ValueError("Not an RSS or Atom feed")
+        feed_title = _text(channel, "title")
+        for entry in channel.iter("item"):
+            link = _text(entry, "link")
+            image = None
+            for tag in ("enclosure", f"{MEDIA}content", f"{MEDIA}thumbnail"):
+                media = entry.find(tag)
+                if media is not None and media.get("url", "").startswith("https://") and \
+                        (tag != "enclosure" or media.get("type", "").startswith("image/")):
+                    image = media.get("url")
+                    break
+            entries.append({
+                "id": _text(entry, "guid") or link,
+                "title": _text(entry, "title") or "Untitled",
+                "link": link,
+                "summary": _plain(_text(entry, "description")),
+                "published": _timestamp(_text(entry, "pubDate")),
+                "image": image,
+            })
+
+    return {"title": feed_title, "entries": [entry for entry in entries if entry["id"]]}
+
+
+def get_feed_subscriptions() -> dict:
+    """{url: [channel_id, ...]} across every guild's rss_feeds setting."""
+    subscriptions = {}
+    for feeds in get_guilds_with("rss_feeds").values():
+        # Malformed entries are skipped so one guild's bad value can't stop everyone's feeds.
+        for feed in valid_entries("rss_feeds", feeds):
+            subscriptions.setdefault(feed["url"], []).append(feed["channel_id"])
+    return subscriptions
+
+
+class RssSource(FeedSource):
+    interval = RSS_POLL_SECONDS
+    first_poll_limit = RSS_FIRST_POLL_LIMIT
+
+    def __init__(self, url: str):
+        super().__init__(f"rss:{url}")
+        self.url = url
+        self.feed_title = url
+
+    async def poll(self, session):
+        feed, _, error = await fetch_parsed(session, self.url, parse_feed)
+        if error:
+            raise RuntimeError(error)
+        self.feed_title = feed["title"] or self.url
+        return [FeedItem(entry["id"], entry, entry["published"]) for entry in feed["entries"]]
+
+    def targets(self, item):
+        return get_feed_subscriptions().get(self.url, [])
+
+    def render(self, item):
+        entry = item.data
+        embed = discord.Embed(
+            title=entry["title"][:256],
+            url=entry["link"] or None,
+            description=entry["summary"] or None,
+            color=discord.Color.teal(),
+            timestamp=datetime.fromtimestamp(entry["published"], timezone.utc) if entry["published"] else None
+        )
+        if entry["image"]:
+            embed.set_image(url=entry["image"])
+        embed.set_footer(text=self.feed_title[:100])
+        return embed, None
@@ -5,19 +5,31 @@ import logging
 import discord
 from discord.ext import commands
 from dotenv import load_dotenv
-from database.stats_store import init_stats_db
+from database.config_store import init_config_db, load_config_cache
+from database.dedupe_store import init_dedupe_db
+from database.engine import close_all
+from database.stats_store import init_stats_db, load_leaderboards, flush_user_stats
+from database.voice_store import init_voice_db
 from keep_alive import keep_alive
 
-init_stats_db()
-
 load_dotenv()
 
 TOKEN = os.getenv("DISCORD_TOKEN")
 GUILD_ID = os.getenv("GUILD_ID")
 SYNC_MODE = os.getenv("SYNC_MODE", "global").lower()
 
+
+class AfterDarkBot(commands.Bot):
+    async def close(self):
+        # Unloads every cog first, then writes queued stats and releases the
+        # shared database connections.
+        await super().close()
+        await flush_user_stats()
+        await close_all()
+
+
 intents = discord.Intents.all()
-bot = commands.Bot(command_prefix="!", intents=intents)
+bot = AfterDarkBot(command_prefix="!", intents=intents)
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -57,7 +69,18 @@ async def setup_hook():
         except Exception as e:
             print(f"❌ Failed to load cog {file.stem}: {e}")
 
-keep_alive()
 
+# Start-up side effects stay under the main guard: worker processes spawned
+# by the cogs re-import this module and must not repeat them.
 if __name__ == "__main__":
+    # Settings and scores saved before per-guild config existed belong to the home guild.
+    home_guild_id = int(GUILD_ID) if GUILD_ID else None
+    init_stats_db(home_guild_id=home_guild_id)
+    load_leaderboards()
+    init_dedupe_db()
+    init_voice_db()
+    init_config_db(home_guild_id=home_guild_id)
+    load_config_cache()
+
+    keep_alive()
     bot.run(TOKEN)
@@ -0,0 +1,120 @@
+# news_parse_bench.py
+#
+# Benchmark of the Dune news parsers on the fixture pages in fixtures/dune_news:
+# full BeautifulSoup trees against the SoupStrainer-limited parse_news_urls /
+# parse_article, then event-loop lag while parsing inline vs in the parser pool.
+#
+#   python news_parse_bench.py [--runs 20] [--parses 5]
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(ROOT, "fixtures", "dune_news")
+TICK_SECONDS = 0.005
+
+
+def full_index(html):
+    """parse_news_urls without the strainer: the pre-strainer behaviour."""
+    from cogs.dune_news import NEWS_PREFIX
+    soup = BeautifulSoup(html, "html.parser")
+    hrefs = [a.get("href", "") for a in soup.find_all("a")]
+    return list(dict.fromkeys(href for href in hrefs if href.startswith(NEWS_PREFIX)))
+
+
+def full_article(html):
+    """Title and paragraphs from a full tree, to compare against parse_article."""
+    soup = BeautifulSoup(html, "html.parser")
+    body = soup.find("div", class_="content")
+    return soup.find("h1").get_text(strip=True), [p.get_text(strip=True) for p in body.find_all("p")]
+
+
+def time_ms(func, html, runs):
+    started = time.perf_counter()
+    for _ in range(runs):
+        func(html)
+    return (time.perf_counter() - started) / runs * 1000
+
+
+async def max_lag_ms(work) -> float:
+    """Worst lateness of a TICK_SECONDS ticker while `work` runs on the same loop."""
+    lag = 0.0
+    stop = False
+
+    async def ticker():
+        nonlocal lag
+        while not stop:
+            started = time.perf_counter()
+            await asyncio.sleep(TICK_SECONDS)
+            lag = max(lag, time.perf_counter() - started - TICK_SECONDS)
+
+    ticking = asyncio.create_task(ticker())
+    await asyncio.sleep(TICK_SECONDS * 4)
+    await work()
+    stop = True
+    await ticking
+    return lag * 1000
+
+
+async def measure_lag(article, parses):
+    from cogs.dune_news import parse_article
+    from feeds.http import get_parser_pool, shutdown_parser_pool
+
+    loop = asyncio.get_running_loop()
+    pool = get_parser_pool()
+    await asyncio.gather(*(loop.run_in_executor(pool, parse_article, "<h1>warm up</h1>") for _ in range(4)))
+
+    async def inline():
+        for _ in range(parses):
+            parse_article(article)
+            await asyncio.sleep(0)
+
+    async def offloaded():
+        for _ in range(parses):
+            await loop.run_in_executor(pool, parse_article, article)
+
+    try:
+        return await max_lag_ms(inline), await max_lag_ms(offloaded)
+    finally:
+        shutdown_parser_pool()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time news parsing: full vs strained, inline vs parser pool.")
+    parser.add_argument("--runs", type=int, default=20, help="parses per timing")
+    parser.add_argument("--parses", type=int, default=5, help="article parses during each loop-lag measurement")
+    args = parser.parse_args()
+
+    sys.path.insert(0, ROOT)
+    from cogs.dune_news import parse_article, parse_news_urls
+
+    with open(os.path.join(FIXTURES, "index.html"), encoding="utf-8") as f:
+        index = f.read()
+    with open(os.path.join(FIXTURES, "article.html"), encoding="utf-8") as f:
+        article = f.read()
+
+    # The strainers must not change what gets extracted.
+    assert parse_news_urls(index) == full_index(index)
+    strained = parse_article(article)
+    title, paragraphs = full_article(article)
+    assert strained["title"] == title and strained["content"] == "\n\n".join(paragraphs)
+    assert strained["image"] and strained["published"]
+
+    print(f"Fixtures: index {len(index) // 1024} KiB ({len(parse_news_urls(index))} news links), "
+          f"article {len(article) // 1024} KiB ({len(paragraphs)} paragraphs)")
+    print(f"  index    full {time_ms(full_index, index, args.runs):6.1f} ms   "
+          f"strained {time_ms(parse_news_urls, index, args.runs):6.1f} ms")
+    print(f"  article  full {time_ms(full_article, article, args.runs):6.1f} ms   "
+          f"strained {time_ms(parse_article, article, args.runs):6.1f} ms")
+
+    inline, pooled = asyncio.run(measure_lag(article, args.parses))
+    print(f"Max loop lag over {args.parses} article parses: inline {inline:.1f} ms, parser pool {pooled:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# news_session_bench.py
+#
+# Benchmark of fetch_news_urls with a new aiohttp session per call (the old
+# behaviour) against a pooled session configured like feeds.http.create_session.
+# Serves a news index from a local aiohttp stand-in, so only connection
+# setup differs between the two modes.
+#
+#   python news_session_bench.py [--calls 50] [--cert cert.pem --key key.pem]
+#
+# Without --cert/--key the stand-in speaks plain HTTP; with them it serves
+# HTTPS and the gap includes the TLS handshake a fresh session pays.
+
+import argparse
+import asyncio
+import os
+import ssl
+import sys
+import tempfile
+import time
+
+import aiohttp
+from aiohttp import web
+
+HOST = "127.0.0.1"
+INDEX_LINKS = 30
+
+
+def news_index_app() -> web.Application:
+    page = "<html><body>" + "".join(
+        f'<a href="https://duneawakening.com/news/article-{n}/">Article {n}</a>' for n in range(INDEX_LINKS)
+    ) + "</body></html>"
+
+    async def index(request):
+        return web.Response(text=page, content_type="text/html")
+
+    app = web.Application()
+    app.router.add_get("/news", index)
+    return app
+
+
+async def run_bench(calls: int, cert: str, key: str):
+    import cogs.dune_news as dune_news
+    from database.engine import close_all
+    from feeds.http import DNS_CACHE_SECONDS, HTTP_POOL_SIZE, KEEPALIVE_SECONDS, init_http_cache
+
+    ssl_context = None
+    if cert:
+        ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+        ssl_context.load_cert_chain(cert, key)
+
+    runner = web.AppRunner(news_index_app())
+    await runner.setup()
+    site = web.TCPSite(runner, HOST, 0, ssl_context=ssl_context)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    dune_news.NEWS_INDEX = f"{'https' if ssl_context else 'http'}://{HOST}:{port}/news"
+    init_http_cache()
+
+    # The stand-in's certificate is self-signed; both modes skip verification alike.
+    verify = not ssl_context
+
+    async def fetch(session):
+        urls, _, error = await dune_news.fetch_news_urls(session)
+        assert urls, error
+
+    try:
+        started = time.perf_counter()
+        for _ in range(calls):
+            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=verify)) as session:
+                await fetch(session)
+        per_call = (time.perf_counter() - started) / calls
+
+        # Same connector settings as feeds.http.create_session.
+        pooled = aiohttp.ClientSession(connector=aiohttp.TCPConnector(
+            ssl=verify, limit=HTTP_POOL_SIZE, ttl_dns_cache=DNS_CACHE_SECONDS, keepalive_timeout=KEEPALIVE_SECONDS
+        ))
+        async with pooled:
+            await fetch(pooled)  # the first call opens the connection the rest reuse
+            started = time.perf_counter()
+            for _ in range(calls):
+                await fetch(pooled)
+            per_pooled = (time.perf_counter() - started) / calls
+    finally:
+        await runner.cleanup()
+        await close_all()
+
+    print(f"{calls} sequential fetch_news_urls calls over {'HTTPS' if ssl_context else 'HTTP'}:")
+    print(f"  new session per call: {per_call * 1000:6.2f} ms/call")
+    print(f"  pooled session:       {per_pooled * 1000:6.2f} ms/call ({per_call / per_pooled:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time news index fetches: new session per call vs pooled session.")
+    parser.add_argument("--calls", type=int, default=50, help="sequential calls per mode")
+    parser.add_argument("--cert", help="PEM certificate for an HTTPS stand-in")
+    parser.add_argument("--key", help="PEM private key for --cert")
+    args = parser.parse_args()
+    if bool(args.cert) != bool(args.key):
+        parser.error("--cert and --key go together")
+
+    cert = os.path.abspath(args.cert) if args.cert else None
+    key = os.path.abspath(args.key) if args.key else None
+    # Run from a scratch directory so http_cache rows don't land in the bot's feeds.sqlite3.
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(tempfile.mkdtemp(prefix="news_session_bench_"))
+    asyncio.run(run_bench(args.calls, cert, key))
+
+
+if __name__ == "__main__":
+    main()
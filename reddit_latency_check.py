@@ -0,0 +1,114 @@
+# reddit_latency_check.py
+#
+# Standalone check that a slow Reddit API never stalls the event loop.
+# Serves a fake Reddit on localhost that holds every listing for a few
+# seconds, polls it through RedditSource on the feed engine's session, and
+# measures how late a 10ms ticker on the same loop gets woken up.
+#
+#   python reddit_latency_check.py [--delay 3] [--max-lag-ms 100]
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+from aiohttp import web
+
+HOST = "127.0.0.1"
+TICK_SECONDS = 0.01
+
+
+def fake_reddit(delay: float) -> web.Application:
+    async def access_token(request):
+        return web.json_response({"access_token": "fake", "expires_in": 3600, "scope": "*", "token_type": "bearer"})
+
+    async def new(request):
+        await asyncio.sleep(delay)
+        subreddit = request.match_info["subreddit"]
+        children = [
+            {"kind": "t3", "data": {
+                "id": f"post{n}", "name": f"t3_post{n}", "title": f"Post {n}", "score": 100,
+                "url": "https://i.redd.it/example.png", "permalink": f"/r/{subreddit}/comments/post{n}/",
+                "author": "someone", "selftext": "", "subreddit": subreddit, "created_utc": time.time() - n,
+            }}
+            for n in range(int(request.query.get("limit", 5)))
+        ]
+        return web.json_response({"kind": "Listing", "data": {"children": children, "after": None, "before": None}})
+
+    app = web.Application()
+    app.router.add_post("/api/v1/access_token", access_token)
+    app.router.add_get("/r/{subreddit}/new", new)
+    return app
+
+
+async def run_check(delay: float, max_lag_ms: float) -> bool:
+    from database.dedupe_store import init_dedupe_db
+    from database.engine import close_all
+    from feeds.http import create_session
+    from cogs.reddit_mirror import RedditSource
+
+    runner = web.AppRunner(fake_reddit(delay))
+    await runner.setup()
+    site = web.TCPSite(runner, HOST, 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    # asyncpraw reads praw.ini from the working directory; point both API hosts at the fake.
+    with open("praw.ini", "w") as ini:
+        ini.write(f"[DEFAULT]\noauth_url=http://{HOST}:{port}\nreddit_url=http://{HOST}:{port}\ncheck_for_updates=False\n")
+    os.environ.setdefault("REDDIT_CLIENT_ID", "fake")
+    os.environ.setdefault("REDDIT_CLIENT_SECRET", "fake")
+    os.environ.setdefault("REDDIT_USER_AGENT", "reddit_latency_check")
+    init_dedupe_db()
+
+    session = create_session()
+    source = RedditSource(bot=None)
+    source.get_routes = lambda guild_id=None: {"test": [(1, 0)]}
+    await source.start(session)
+
+    lag = 0.0
+    ticks = 0
+
+    async def ticker():
+        nonlocal lag, ticks
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(TICK_SECONDS)
+            lag = max(lag, time.perf_counter() - started - TICK_SECONDS)
+            ticks += 1
+
+    ticking = asyncio.create_task(ticker())
+    started = time.perf_counter()
+    try:
+        items = await source.poll(session)
+    finally:
+        elapsed = time.perf_counter() - started
+        ticking.cancel()
+        await source.close()
+        await session.close()
+        await runner.cleanup()
+        await close_all()
+
+    print(f"Polled {len(items)} item(s) in {elapsed:.2f}s against a {delay:.1f}s endpoint; "
+          f"{ticks} ticks, max loop lag {lag * 1000:.1f}ms")
+    ok = bool(items) and elapsed >= delay and lag * 1000 <= max_lag_ms
+    print("✅ Loop stayed responsive." if ok else "❌ Check failed.")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check that a slow Reddit API doesn't stall the event loop.")
+    parser.add_argument("--delay", type=float, default=3.0, help="seconds the fake endpoint holds each listing")
+    parser.add_argument("--max-lag-ms", type=float, default=100.0, help="worst acceptable ticker lag")
+    args = parser.parse_args()
+
+    # Run from a scratch directory so the cursor and dedupe tables don't touch the bot's settings.db.
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    os.chdir(tempfile.mkdtemp(prefix="reddit_latency_check_"))
+    sys.exit(0 if asyncio.run(run_check(args.delay, args.max_lag_ms)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# welcome_card.py
+
+import asyncio
+import io
+import multiprocessing
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+try:
+    from PIL import Image, ImageDraw, ImageFont, ImageOps
+except ImportError:  # Pillow is optional: without it Welcome keeps sending text.
+    Image = None
+
+CARD_SIZE = (800, 250)
+AVATAR_SIZE = 160
+AVATAR_TOP = (CARD_SIZE[1] - AVATAR_SIZE) // 2
+TEXT_X = 40 + AVATAR_SIZE + 40
+BACKGROUND = (30, 31, 34)
+ACCENT = (88, 101, 242)
+CARD_WORKERS = max(1, min(4, (os.cpu_count() or 1)))
+MAX_PENDING_RENDERS = CARD_WORKERS * 2  # beyond this the caller gets None and sends text
+AVATAR_CACHE_SIZE = 512
+
+
+# ─── Worker side: runs in the pool, bytes in, PNG bytes out ───
+
+@lru_cache(maxsize=4)
+def _font(size: int):
+    for name in ("DejaVuSans-Bold.ttf", "arial.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+@lru_cache(maxsize=128)
+def _avatar_disc(avatar_key: str, data: bytes):
+    """Decoded, resized and circle-masked once per avatar per worker."""
+    avatar = Image.open(io.BytesIO(data)).convert("RGBA")
+    avatar = ImageOps.fit(avatar, (AVATAR_SIZE, AVATAR_SIZE), Image.LANCZOS)
+    mask = Image.new("L", (AVATAR_SIZE * 4, AVATAR_SIZE * 4), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, AVATAR_SIZE * 4, AVATAR_SIZE * 4), fill=255)
+    avatar.putalpha(mask.resize((AVATAR_SIZE, AVATAR_SIZE), Image.LANCZOS))
+    return avatar
+
+
+@lru_cache(maxsize=1)
+def _background():
+    """The parts every card shares: background, accent bar and avatar ring."""
+    card = Image.new("RGBA", CARD_SIZE, BACKGROUND)
+    draw = ImageDraw.Draw(card)
+    draw.rectangle((0, 0, 12, CARD_SIZE[1]), fill=ACCENT)
+    draw.ellipse((40 - 4, AVATAR_TOP - 4, 40 + AVATAR_SIZE + 4, AVATAR_TOP + AVATAR_SIZE + 4), fill=ACCENT)
+    draw.text((TEXT_X, 62), "Welcome", font=_font(28), fill=(185, 187, 190))
+    return card
+
+
+def render_card(avatar_key: str, avatar: bytes, name: str, member_number: int, guild_name: str) -> bytes:
+    # Name and member number differ on every join, so only the background and the
+    # avatar disc (keyed by avatar hash) are cached; the rest is drawn per card.
+    card = _background().copy()
+    card.alpha_composite(_avatar_disc(avatar_key, avatar), (40, AVATAR_TOP))
+
+    draw = ImageDraw.Draw(card)
+    if len(name) > 24:
+        name = name[:23] + "…"
+    draw.text((TEXT_X, 98), name, font=_font(44), fill=(255, 255, 255))
+    draw.text((TEXT_X, 160), f"Member #{member_number:,} of {guild_name[:32]}", font=_font(24), fill=(185, 187, 190))
+
+    out = io.BytesIO()
+    card.convert("RGB").save(out, "PNG", optimize=False, compress_level=3)
+    return out.getvalue()
+
+
+# ─── Bot side ───
+
+class LRUCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items = OrderedDict()
+
+    def get(self, key):
+        value = self._items.get(key)
+        if value is not None:
+            self._items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+
+class CardRenderer:
+    """Renders welcome cards off the event loop; returns None instead of queueing when busy."""
+
+    def __init__(self, workers: int = CARD_WORKERS, max_pending: int = MAX_PENDING_RENDERS):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.pool = None
+        # No cache of finished cards: the member number differs on every join, so no two would match.
+        self.avatars = LRUCache(AVATAR_CACHE_SIZE)  # {avatar_key: image bytes}
+        self.stats = {"rendered": 0, "avatar_hits": 0, "saturated": 0, "failed": 0}
+
+    @property
+    def available(self) -> bool:
+        return Image is not None
+
+    def start(self):
+        if self.pool is None and self.available:
+            # spawn: forking a process that already runs threads (aiosqlite, Flask) is unsafe.
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    async def render(self, member) -> bytes:
+        """PNG bytes for `member`, or None when Pillow is missing, the pool is saturated or rendering failed."""
+        if self.pool is None:
+            return None
+
+        avatar_asset = member.display_avatar.with_format("png").with_size(256)
+        avatar_key = member.display_avatar.key
+        if self.pending >= self.max_pending:
+            self.stats["saturated"] += 1
+            return None
+
+        self.pending += 1
+        try:
+            avatar = self.avatars.get(avatar_key)
+            if avatar is None:
+                avatar = await avatar_asset.read()
+                self.avatars.put(avatar_key, avatar)
+            else:
+                self.stats["avatar_hits"] += 1
+
+            card = await asyncio.get_running_loop().run_in_executor(
+                self.pool, render_card, avatar_key, avatar,
+                member.display_name, member.guild.member_count or 0, member.guild.name
+            )
+        except Exception as e:
+            self.stats["failed"] += 1
+            print(f"[Welcome] Failed to render a card for {member.id}: {e}")
+            return None
+        finally:
+            self.pending -= 1
+
+        self.stats["rendered"] += 1
+        return card
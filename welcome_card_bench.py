@@ -0,0 +1,122 @@
+# welcome_card_bench.py
+#
+# Throughput and event-loop lag of welcome card rendering through
+# welcome_card.CardRenderer, with a configurable number of worker processes.
+#
+#   python welcome_card_bench.py [--workers 4] [--cards 400] [--shared-avatar]
+#
+# Avatars are generated PNGs served from memory, so the figures cover
+# rendering and the process pool, not Discord's CDN.
+
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+
+TICK_SECONDS = 0.005
+AVATAR_VARIANTS = 64
+
+
+def make_avatars(count: int) -> list[bytes]:
+    from PIL import Image, ImageDraw
+
+    avatars = []
+    for n in range(count):
+        image = Image.new("RGB", (256, 256), ((n * 37) % 255, (n * 91) % 255, (n * 53) % 255))
+        ImageDraw.Draw(image).ellipse((64, 64, 192, 192), fill=((n * 13) % 255, 200, 120))
+        out = io.BytesIO()
+        image.save(out, "PNG")
+        avatars.append(out.getvalue())
+    return avatars
+
+
+class FakeAsset:
+    def __init__(self, key: str, data: bytes):
+        self.key = key
+        self.data = data
+
+    def with_format(self, _):
+        return self
+
+    def with_size(self, _):
+        return self
+
+    async def read(self):
+        return self.data
+
+
+class FakeGuild:
+    name = "Benchmark Guild"
+    member_count = 0
+
+
+class FakeMember:
+    def __init__(self, member_id: int, asset: FakeAsset, guild: FakeGuild):
+        self.id = member_id
+        self.display_name = f"Member {member_id}"
+        self.display_avatar = asset
+        self.guild = guild
+
+
+async def run_bench(workers: int, cards: int, shared_avatar: bool):
+    from welcome_card import CardRenderer
+
+    avatars = make_avatars(AVATAR_VARIANTS)
+    guild = FakeGuild()
+
+    def member(n: int) -> FakeMember:
+        # Unique keys per member unless --shared-avatar, like everyone on the default avatar.
+        key = "default" if shared_avatar else f"avatar-{n}"
+        return FakeMember(n, FakeAsset(key, avatars[0 if shared_avatar else n % AVATAR_VARIANTS]), guild)
+
+    # No saturation limit: every card is rendered, so the rate is the pool's throughput.
+    renderer = CardRenderer(workers=workers, max_pending=cards + workers)
+    renderer.start()
+    try:
+        # Spawn and warm every worker outside the timing.
+        await asyncio.gather(*(renderer.render(member(-n - 1)) for n in range(workers * 2)))
+
+        lag = 0.0
+        stop = False
+
+        async def ticker():
+            nonlocal lag
+            while not stop:
+                started = time.perf_counter()
+                await asyncio.sleep(TICK_SECONDS)
+                lag = max(lag, time.perf_counter() - started - TICK_SECONDS)
+
+        ticking = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        results = []
+        for n in range(cards):
+            guild.member_count = 1000 + n
+            results.append(asyncio.ensure_future(renderer.render(member(n))))
+        results = await asyncio.gather(*results)
+        elapsed = time.perf_counter() - started
+        stop = True
+        await ticking
+    finally:
+        renderer.shutdown()
+
+    assert all(results), renderer.stats
+    print(f"{cards} cards, {workers} worker(s) on {os.cpu_count()} CPU(s), "
+          f"{'shared' if shared_avatar else 'unique'} avatars:")
+    print(f"  {cards / elapsed:.0f} cards/s, max loop lag {lag * 1000:.1f} ms, stats {renderer.stats}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure welcome card rendering throughput through the process pool.")
+    parser.add_argument("--workers", type=int, default=4, help="renderer worker processes")
+    parser.add_argument("--cards", type=int, default=400, help="cards to render")
+    parser.add_argument("--shared-avatar", action="store_true", help="every member uses the same avatar")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    asyncio.run(run_bench(args.workers, args.cards, args.shared_avatar))
+
+
+if __name__ == "__main__":
+    main()